@@ -0,0 +1,61 @@
+"""
+Benchmark del temps d'importació d'ex3.py
+Pràctica 1 - Criptografia
+EX3
+
+Importa ex3 en processos nous (com faria un treballador del pool) i mesura el
+temps amb -X importtime. Falla si la importació escriu res, si carrega NumPy o
+multiprocessing, o si la mediana supera el límit.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+DIRECTORI = os.path.dirname(os.path.abspath(__file__))
+MODULS_PROHIBITS = ('numpy', 'multiprocessing')
+
+def temps_importacio(modul='ex3'):
+    """
+    Importa el mòdul en un procés nou i retorna el temps acumulat i la sortida.
+
+    Args:
+        modul (str): Nom del mòdul a importar
+
+    Returns:
+        tuple: (microsegons acumulats, stdout, mòduls prohibits carregats)
+    """
+    codi = f"import sys, {modul}; sys.stderr.flush(); print(*[m for m in {MODULS_PROHIBITS!r} if m in sys.modules], file=sys.stderr)"
+    proces = subprocess.run([sys.executable, '-X', 'importtime', '-c', codi],
+                            cwd=DIRECTORI, capture_output=True, text=True, check=True)
+    linies = proces.stderr.splitlines()
+    microsegons = None
+    for linia in linies:
+        if linia.startswith('import time:') and linia.rstrip().endswith(f'| {modul}'):
+            microsegons = int(linia.split('|')[1])
+    return microsegons, proces.stdout, linies[-1].split() if linies else []
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mesura el temps d'importació d'ex3.py.")
+    parser.add_argument('-n', '--repeticions', type=int, default=10, help="Importacions a mesurar")
+    parser.add_argument('--limit-ms', type=float, default=50.0, help="Mediana màxima acceptada (ms)")
+    args = parser.parse_args(argv)
+
+    mesures = []
+    for _ in range(args.repeticions):
+        microsegons, sortida, carregats = temps_importacio()
+        if sortida:
+            sys.exit(f"ERROR: importar ex3 escriu per stdout:\n{sortida}")
+        if carregats:
+            sys.exit(f"ERROR: importar ex3 carrega {', '.join(carregats)}")
+        mesures.append(microsegons / 1000)
+
+    mediana = statistics.median(mesures)
+    print(f"import ex3: mediana {mediana:.2f} ms, mínim {min(mesures):.2f} ms ({args.repeticions} repeticions)")
+    if mediana > args.limit_ms:
+        sys.exit(f"ERROR: la importació supera el límit de {args.limit_ms:.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,15 @@
+import os
 import re
+import sys
+import importlib.util
 from collections import Counter
+from functools import lru_cache
 import math
 
-# Text xifrat
+#Importar el mòdul no executa cap anàlisi: NumPy, multiprocessing i les taules
+#de freqüències es carreguen la primera vegada que es fan servir.
+
+# Text xifrat d'exemple
 ciphertext = """
 tl fmmcse dilwhkb mg qgiibhocaeqlw iafjx qdnxonh rof i xlpmxv ws zalqlyx o izhjp dx
 stgxsdq xg jn fmmcse imk oiavik sas qqyfptzml rt snjlhxtnkbc eoeqtzuaummwra vwf sa
@@ -33,19 +40,78 @@ mxbhrt elbtrxsmqv hgawqvwdntt wsa xbnkoigx lx qtstz a
 """
 
 #Netejar el text dels espais i números
-ciphertext = re.sub(r'[^a-zA-Z]', '', ciphertext).lower()
-
-# --- FREQÜÈNCIES CATALÀ ---
-spanish_freq = {
-    'a':12.53,'b':1.49,'c':4.68,'d':5.86,'e':13.68,'f':0.52,'g':1.01,
-    'h':0.70,'i':6.25,'j':0.44,'k':0.11,'l':8.37,'m':3.15,'n':7.01,
-    'o':8.68,'p':2.51,'q':0.88,'r':6.87,'s':7.88,'t':4.63,'u':3.93,
-    'v':0.90,'w':0.04,'x':0.22,'y':0.90,'z':0.47
+def clean_text(text):
+    return re.sub(r'[^a-zA-Z]', '', text).lower()
+
+ciphertext = clean_text(ciphertext)
+
+# --- FREQÜÈNCIES (CATALÀ I ANGLÈS) ---
+#Percentatges en ordre alfabètic, per idioma
+FREQUENCIES = {
+    'ca': {
+        'a':12.53,'b':1.49,'c':4.68,'d':5.86,'e':13.68,'f':0.52,'g':1.01,
+        'h':0.70,'i':6.25,'j':0.44,'k':0.11,'l':8.37,'m':3.15,'n':7.01,
+        'o':8.68,'p':2.51,'q':0.88,'r':6.87,'s':7.88,'t':4.63,'u':3.93,
+        'v':0.90,'w':0.04,'x':0.22,'y':0.90,'z':0.47
+    },
+    'en': {
+        'a':8.2,'b':1.3,'c':2.8,'d':4.3,'e':12.7,'f':2.2,'g':2.0,
+        'h':6.1,'i':7.0,'j':0.15,'k':0.8,'l':4.0,'m':2.4,'n':6.7,
+        'o':7.5,'p':1.9,'q':0.10,'r':6.0,'s':6.3,'t':9.1,'u':2.8,
+        'v':1.0,'w':2.4,'x':0.15,'y':2.0,'z':0.07
+    },
 }
+_freq_tables = {}
+
 # Arrodonir les freqüències perquè si les sumem donin 100.
 # Serveix per poder poder utilitzar en text de diferents tamanys
-total = sum(spanish_freq.values())
-spanish_freq = {k: v/total for k,v in spanish_freq.items()}
+# Es calcula una sola vegada per idioma, quan es demana per primer cop.
+# Si l'idioma té model al magatzem de n-grames (modelo_ngramas.py) es fa servir
+# el seu unigrama restringit a a-z; si no, la taula de FREQUENCIES.
+def language_freq(lang='ca'):
+    table = _freq_tables.get(lang)
+    if table is None:
+        model = _ngram_model(lang)
+        if model is not None:
+            table = model.unigramas('abcdefghijklmnopqrstuvwxyz')
+        else:
+            raw = FREQUENCIES[lang]
+            total = sum(raw.values())
+            table = {k: v/total for k,v in raw.items()}
+        _freq_tables[lang] = table
+    return table
+
+#Mòdul modelo_ngramas.py de Pràctica 1, carregat pel seu camí sense tocar sys.path.
+#Si ja s'ha importat (per exemple des de Pràctica 1) es reaprofita, amb els seus models.
+NGRAM_STORE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'modelo_ngramas.py')
+
+def _ngram_store():
+    module = sys.modules.get('modelo_ngramas')
+    if module is None:
+        spec = importlib.util.spec_from_file_location('modelo_ngramas', NGRAM_STORE)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules['modelo_ngramas'] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules['modelo_ngramas']
+            raise
+    return module
+
+#Nom antic de la taula de referència (les freqüències del català, normalitzades),
+#calculada només quan algú la demana
+def __getattr__(name):
+    if name == 'spanish_freq':
+        return language_freq('ca')
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+#Model del magatzem de n-grames, si n'hi ha per a l'idioma (no es construeix mai des d'aquí:
+#python modelo_ngramas.py IDIOMA CORPUS)
+def _ngram_model(lang):
+    store = _ngram_store()
+    if lang in FREQUENCIES and not os.path.exists(store.ruta_modelo(lang)):
+        return None
+    return store.cargar_modelo(lang)
 
 # Mirem la concentració de les lletres repetides
 # El nostre objectiu es 0,07
@@ -59,9 +125,10 @@ def index_coincidence(text):
 #Separa el text i el separa en K textos.
 #Calcula l'índex de coincidéncia del subtext i fa la mitjana
 #retorna la k més llarga
-def kasiski_guess_keylen(text, max_len=20):
+#key_lens limita les longituds a provar (per defecte 1..max_len)
+def kasiski_guess_keylen(text, max_len=20, key_lens=None):
     results = {}
-    for key_len in range(1, max_len+1):
+    for key_len in key_lens or range(1, max_len+1):
         ic_values = []
         for i in range(key_len):
             subtext = text[i::key_len]
@@ -71,27 +138,64 @@ def kasiski_guess_keylen(text, max_len=20):
 #Compara freqüències amb els subtextos
 #Comota quantes vegades surt una lletra i ho compara amb el que serie esperavle
 #Fórmula (observat - espetat)²/esperat
-def chi_squared_stat(subtext, shift):
-    # Desplaça el subtext
-    shifted = ''.join(chr((ord(c)-ord('a')-shift) % 26 + ord('a')) for c in subtext)
-    freqs = Counter(shifted)
-    N = len(shifted)
-    chi2 = 0 
-    for ch in spanish_freq:
-        observed = freqs.get(ch, 0)
-        expected = spanish_freq[ch] * N
+#En lloc de desplaçar el subtext es compta tal com està i es compara amb la taula rotada:
+#la lletra ch desplaçada surt de la lletra xifrada ch+shift
+def chi_squared_stat(subtext, shift, lang='ca'):
+    freqs = _column_counts(subtext)
+    return _chi_squared_counts(freqs, len(subtext), shift, lang)
+
+#Comptatge per codi 0..25. El text net (a-z) va per encode_text; qualsevol altre
+#caràcter (majúscules, accents) es compta amb la mateixa aritmètica que el desplaçament original
+def _column_counts(subtext):
+    if subtext.isascii() and subtext.isalpha() and subtext.islower():
+        return Counter(encode_text(subtext))
+    return Counter((ord(c) - ord('a')) % 26 for c in subtext)
+
+def _chi_squared_counts(freqs, N, shift, lang):
+    chi2 = 0
+    for code, expected in expected_counts(lang, N, shift):
+        observed = freqs.get(code, 0)
         chi2 += (observed-expected)**2 / expected if expected>0 else 0
     return chi2
+
+# --- MEMÒRIA CAU ---
+#Taules per (idioma, desplaçament) i vectors d'esperats per (idioma, N, desplaçament),
+#en LRU acotades: columnes de la mateixa llargada reutilitzen els mateixos vectors.
+#rotated_freq.cache_info() i expected_counts.cache_info() donen encerts i fallades.
+CACHE_SIZE = 4096
+
+#Parells (codi de la lletra xifrada, freqüència de la lletra clara) en ordre alfabètic
+@lru_cache(maxsize=64)
+def rotated_freq(lang, shift):
+    freq = language_freq(lang)
+    return tuple(((ord(ch) - ord('a') + shift) % 26, p) for ch, p in freq.items())
+
+@lru_cache(maxsize=CACHE_SIZE)
+def expected_counts(lang, N, shift):
+    return tuple((code, p * N) for code, p in rotated_freq(lang, shift))
+
+#Inverses rotades per a chi_squared_matrix, un cop per idioma (no s'han de modificar)
+@lru_cache(maxsize=16)
+def _inverse_table(lang):
+    np = _numpy()
+    freqs = np.array(list(language_freq(lang).values()))
+    rows = np.arange(26)
+    return 1.0 / freqs[(rows[:, None] - rows[None, :]) % 26]
+
+def cache_info():
+    return {'rotated_freq': rotated_freq.cache_info(), 'expected_counts': expected_counts.cache_info(),
+            'inverse_table': _inverse_table.cache_info()}
 #Troba la clau lletra per lletra.
 #Divideix el text en subalfabets i prova els 26 desplaçaments
 #tria el més petit 
-def guess_key_spanish(text, key_len):
+def guess_key_spanish(text, key_len, lang='ca'):
     key = ""
     for i in range(key_len):
         subtext = text[i::key_len]
+        freqs = _column_counts(subtext)
         best_shift, best_chi2 = None, 1e9
         for shift in range(26):
-            chi2 = chi_squared_stat(subtext, shift)
+            chi2 = _chi_squared_counts(freqs, len(subtext), shift, lang)
             if chi2 < best_chi2:
                 best_chi2, best_shift = chi2, shift
         key += chr(ord('a') + best_shift)
@@ -108,15 +212,304 @@ def vigenere_decrypt(text, key):
             plain.append(chr(ord('a') + p))
     return ''.join(plain)
 
+# --- EXAMEN DE KASISKI ---
+#Una sola passada amb un índex (hash) de n-grames: per a cada n-grama repetit
+#es compta la distància a l'aparició anterior. Una repetició més llarga de L
+#lletres genera L-n+1 n-grames repetits a la mateixa distància i pesa més.
+def repeated_distances(text, n=3):
+    last = {}
+    distances = Counter()
+    for i in range(len(text)-n+1):
+        gram = text[i:i+n]
+        j = last.get(gram)
+        if j is not None:
+            distances[i-j] += 1
+        last[gram] = i
+    return distances
+
+#Vot de cada longitud: fracció de distàncies que divideix, relativa a l'1/k
+#que s'esperaria per atzar (la longitud real dona ≈ k).
+#Si cap n-grama es repeteix no hi ha evidència: retorna None i es proven totes les longituds
+def kasiski_votes(text, max_len=20, n=3):
+    distances = repeated_distances(text, n)
+    total = sum(distances.values())
+    if not total:
+        return None
+    #Recorre només els múltiples de cada longitud, no totes les distàncies
+    by_distance = [0] * (max(distances, default=0) + 1)
+    for d, c in distances.items():
+        by_distance[d] = c
+    votes = {}
+    for key_len in range(1, max_len+1):
+        hits = sum(by_distance[key_len::key_len])
+        votes[key_len] = hits * key_len / total
+    return votes
+
+#Les keep longituds més votades: només aquestes passen al càlcul d'IC i chi-quadrat
+def kasiski_candidates(votes, keep=5):
+    return sorted(sorted(votes, key=votes.get, reverse=True)[:keep])
+
+#Combina IC i vots; entre puntuacions properes (tolerance) tria la més curta,
+#perquè els múltiples de la clau real puntuen gairebé igual
+def best_keylen(ic_results, votes=None, tolerance=0.9):
+    scores = {k: ic * (votes[k] if votes else 1.0) for k, ic in ic_results.items()}
+    best = max(scores.values())
+    return min(k for k, score in scores.items() if score >= best * tolerance)
+
+#Codifica el text net (només a-z) com a bytes 0..25, una sola vegada
+CODIFICA = bytes.maketrans(b'abcdefghijklmnopqrstuvwxyz', bytes(range(26)))
+def encode_text(text):
+    return text.encode('ascii').translate(CODIFICA)
+
+# --- BACKEND NUMPY ---
+#Mateixos càlculs sobre un array uint8 codificat una sola vegada.
+#NumPy s'importa en el primer ús; sense NumPy queda el backend de Python.
+_np = None
+
+def _numpy():
+    global _np
+    if _np is None:
+        import numpy
+        _np = numpy
+    return _np
+
+def numpy_available():
+    return _np is not None or importlib.util.find_spec('numpy') is not None
+
+def encode_array(text):
+    np = _numpy()
+    return np.frombuffer(encode_text(text), dtype=np.uint8)
+
+#Histograma de cada columna (fila i = lletres i, i+k, i+2k...) amb un sol bincount
+def column_histograms(codes, key_len):
+    np = _numpy()
+    m = len(codes) - len(codes) % key_len
+    body = codes[:m].reshape(-1, key_len) + 26 * np.arange(key_len)
+    tail = codes[m:] + 26 * np.arange(len(codes) - m)
+    index = np.concatenate((body.ravel(), tail))
+    return np.bincount(index, minlength=26*key_len).reshape(key_len, 26)
+
+def kasiski_guess_keylen_np(codes, max_len=20, key_lens=None):
+    np = _numpy()
+    codes = codes.astype(np.int64)
+    results = {}
+    for key_len in key_lens or range(1, max_len+1):
+        hist = column_histograms(codes, key_len)
+        N = hist.sum(axis=1)
+        pairs = (hist * (hist - 1)).sum(axis=1)
+        ic_values = np.where(N > 1, pairs / np.maximum(N * (N - 1), 1), 0.0)
+        results[key_len] = sum(ic_values.tolist()) / key_len
+    return results
+
+#Chi-quadrat de tots els desplaçaments com a producte de matrius:
+#sum((o-e)²/e) = sum(o²/e) - N, i o per al desplaçament s és hist[(j+s)%26]
+def chi_squared_matrix(hist, lang='ca'):
+    np = _numpy()
+    inverse = _inverse_table(lang)
+    N = hist.sum(axis=1, keepdims=True).astype(float)
+    chi = (hist.astype(float) ** 2) @ inverse / np.maximum(N, 1) - N
+    return np.where(N > 0, chi, 0.0)
+
+def guess_key_spanish_np(codes, key_len, lang='ca'):
+    np = _numpy()
+    shifts = chi_squared_matrix(column_histograms(codes.astype(np.int64), key_len), lang).argmin(axis=1)
+    return ''.join(chr(ord('a') + s) for s in shifts.tolist())
+
+#Resta modular vectoritzada; el text ha d'estar net (només a-z)
+def vigenere_decrypt_np(codes, key):
+    np = _numpy()
+    shifts = np.frombuffer(key.lower().encode('ascii'), dtype=np.uint8) - ord('a')
+    plain = (codes + 26 - np.resize(shifts, len(codes))) % 26 + ord('a')
+    return plain.astype(np.uint8).tobytes().decode('ascii')
+
+# --- LOTS ---
+#Molts textos curts alhora: una matriu uint8 (textos x longitud màxima) amb
+#els codis 0..25 i 26 de farciment, més el vector de longituds
+def pack_texts(texts):
+    np = _numpy()
+    encoded = [encode_text(clean_text(t)) for t in texts]
+    lengths = np.array([len(e) for e in encoded], dtype=np.int64)
+    width = int(lengths.max()) if len(encoded) else 0
+    matrix = np.full((len(encoded), width), 26, dtype=np.uint8)
+    matrix[np.arange(width) < lengths[:, None]] = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    return matrix, lengths
+
+#Histogrames (textos x key_len x 26) de les columnes de cada text amb un sol bincount;
+#el farciment cau a la casella 26, que es descarta
+def batch_column_histograms(matrix, key_len):
+    np = _numpy()
+    rows, width = matrix.shape
+    cell = (np.arange(rows)[:, None] * key_len + np.arange(width) % key_len) * 27
+    index = (cell + matrix).ravel()
+    return np.bincount(index, minlength=rows*key_len*27).reshape(rows, key_len, 27)[:, :, :26]
+
+#IC mitjà de cada text per a cada longitud (matriu textos x max_len),
+#com kasiski_guess_keylen per a cada text
+def batch_keylen_ic(matrix, max_len=20):
+    np = _numpy()
+    ic = np.zeros((matrix.shape[0], max_len))
+    for key_len in range(1, max_len+1):
+        hist = batch_column_histograms(matrix, key_len).astype(np.int64)
+        N = hist.sum(axis=2)
+        pairs = (hist * (hist - 1)).sum(axis=2)
+        ic[:, key_len-1] = np.where(N > 1, pairs / np.maximum(N * (N - 1), 1), 0.0).sum(axis=1) / key_len
+    return ic
+
+#best_keylen per files: la longitud més curta amb IC >= tolerance * màxim
+def batch_best_keylen(ic, tolerance=0.9):
+    np = _numpy()
+    return (ic >= ic.max(axis=1, keepdims=True) * tolerance).argmax(axis=1) + 1
+
+#Criptoanàlisi de tot el lot (sense examen de Kasiski, com crack_vigenere amb kasiski=0).
+#Les claus es busquen agrupant els textos per longitud triada.
+#Retorna un array estructurat: key_len, key i ic per text (i els textos desxifrats si decrypt)
+def crack_vigenere_batch(texts, max_len=20, lang='ca', decrypt=False):
+    np = _numpy()
+    matrix, lengths = pack_texts(texts)
+    ic = batch_keylen_ic(matrix, max_len)
+    key_lens = batch_best_keylen(ic)
+    shifts = np.zeros((len(texts), max_len), dtype=np.int64)
+    for key_len in np.unique(key_lens).tolist():
+        rows = np.flatnonzero(key_lens == key_len)
+        hist = batch_column_histograms(matrix[rows], key_len).reshape(-1, 26)
+        shifts[rows, :key_len] = chi_squared_matrix(hist, lang).argmin(axis=1).reshape(len(rows), key_len)
+    letters = (shifts + ord('a')).astype(np.uint8)
+    result = np.empty(len(texts), dtype=[('key_len', np.int64), ('key', f'U{max_len}'), ('ic', np.float64)])
+    result['key_len'] = key_lens
+    result['key'] = [letters[r, :k].tobytes().decode('ascii') for r, k in enumerate(key_lens.tolist())]
+    result['ic'] = ic[np.arange(len(texts)), key_lens - 1]
+    if decrypt:
+        return result, decrypt_batch(matrix, lengths, shifts, key_lens)
+    return result
+
+#Desxifra totes les files alhora: la columna de cada posició és posició % key_len de la fila
+def decrypt_batch(matrix, lengths, shifts, key_lens):
+    np = _numpy()
+    width = matrix.shape[1]
+    column = np.arange(width)[None, :] % key_lens[:, None]
+    plain = (matrix.astype(np.int64) + 26 - np.take_along_axis(shifts, column, axis=1)) % 26 + ord('a')
+    plain = plain.astype(np.uint8)
+    return [plain[r, :n].tobytes().decode('ascii') for r, n in enumerate(lengths.tolist())]
+
+# --- MODE PARAL·LEL ---
+#Els processos del pool s'enganxen a una única còpia del text codificat
+#en memòria compartida: les tasques només porten (key_len, columna)
+_shared = None
+_encoded = None
+
+def _init_worker(name, n):
+    global _shared, _encoded
+    from multiprocessing import shared_memory
+    _shared = shared_memory.SharedMemory(name=name)
+    _encoded = _shared.buf[:n]
+
+#Mateixa fórmula que index_coincidence, sobre una columna codificada
+def _column_ic(task):
+    key_len, i = task
+    column = bytes(_encoded[i::key_len])
+    N = len(column)
+    freqs = Counter(column)
+    return sum(f*(f-1) for f in freqs.values()) / (N*(N-1)) if N > 1 else 0
+
+#Mateix recorregut que guess_key_spanish: la lletra j desplaçada surt de j+shift
+def _column_best_shift(task):
+    key_len, i, lang = task
+    freqs = Counter(bytes(_encoded[i::key_len]))
+    N = sum(freqs.values())
+    best_shift, best_chi2 = None, 1e9
+    for shift in range(26):
+        chi2 = _chi_squared_counts(freqs, N, shift, lang)
+        if chi2 < best_chi2:
+            best_chi2, best_shift = chi2, shift
+    return best_shift
+
+#Obre el pool amb el text codificat a memòria compartida
+class ParallelAnalysis:
+    def __init__(self, text, processes=None):
+        from multiprocessing import Pool, shared_memory
+        encoded = encode_text(text)
+        self.n = len(encoded)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(self.n, 1))
+        self.shm.buf[:self.n] = encoded
+        self.pool = Pool(processes, initializer=_init_worker, initargs=(self.shm.name, self.n))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.pool.close()
+        self.pool.join()
+        self.shm.close()
+        self.shm.unlink()
+
+    #Equivalent a kasiski_guess_keylen: una tasca per columna de cada longitud
+    def guess_keylen(self, max_len=20, key_lens=None):
+        key_lens = key_lens or range(1, max_len+1)
+        tasks = [(key_len, i) for key_len in key_lens for i in range(key_len)]
+        ics = iter(self.pool.map(_column_ic, tasks))
+        results = {}
+        for key_len in key_lens:
+            ic_values = [next(ics) for _ in range(key_len)]
+            results[key_len] = sum(ic_values) / len(ic_values)
+        return results
+
+    #Equivalent a guess_key_spanish: una tasca per columna
+    def guess_key(self, key_len, lang='ca'):
+        shifts = self.pool.map(_column_best_shift, [(key_len, i, lang) for i in range(key_len)])
+        return ''.join(chr(ord('a') + s) for s in shifts)
+
+# --- CRIPTOANÀLISI COMPLETA ---
+#Neteja el text, tria la longitud (Kasiski + IC), troba la clau i desxifra.
+#backend: 'auto' (NumPy si hi és), 'numpy' o 'python'; processes > 0 fa servir el pool
+#Retorna (longitud, clau, text desxifrat)
+def crack_vigenere(text, max_len=20, lang='ca', kasiski=5, backend='auto', processes=0):
+    text = clean_text(text)
+    votes = kasiski_votes(text, max_len) if kasiski > 0 else None
+    key_lens = kasiski_candidates(votes, kasiski) if votes else None
+
+    if processes > 0:
+        with ParallelAnalysis(text, processes) as analysis:
+            ic_results = analysis.guess_keylen(max_len, key_lens)
+            key_len = best_keylen(ic_results, votes)
+            key = analysis.guess_key(key_len, lang)
+        plaintext = vigenere_decrypt(text, key)
+    elif backend == 'numpy' or (backend == 'auto' and numpy_available()):
+        codes = encode_array(text)
+        ic_results = kasiski_guess_keylen_np(codes, max_len, key_lens)
+        key_len = best_keylen(ic_results, votes)
+        key = guess_key_spanish_np(codes, key_len, lang)
+        plaintext = vigenere_decrypt_np(codes, key)
+    else:
+        ic_results = kasiski_guess_keylen(text, max_len, key_lens)
+        key_len = best_keylen(ic_results, votes)
+        key = guess_key_spanish(text, key_len, lang)
+        plaintext = vigenere_decrypt(text, key)
+    return key_len, key, plaintext
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Criptoanàlisi de Vigenère")
+    parser.add_argument('fitxer', nargs='?', help="Fitxer amb el text xifrat (per defecte, el text d'exemple)")
+    parser.add_argument('-j', '--processos', type=int, default=0, help="Processos del pool (0 = mode sèrie)")
+    parser.add_argument('-b', '--backend', choices=['auto', 'numpy', 'python'], default='auto', help="Backend del mode sèrie")
+    parser.add_argument('-m', '--max-len', type=int, default=20, help="Longitud màxima de clau a provar")
+    parser.add_argument('-k', '--kasiski', type=int, default=5, help="Candidats que conserva l'examen de Kasiski (0 = sense)")
+    parser.add_argument('-l', '--idioma', default='ca', help="Freqüències de referència (ca, en o un model de n-grames)")
+    args = parser.parse_args(argv)
+    if args.backend == 'numpy' and not numpy_available():
+        parser.error("NumPy no està instal·lat")
 
-ic_results = kasiski_guess_keylen(ciphertext, 20)
-key_len = max(ic_results, key=ic_results.get)
+    text = ciphertext
+    if args.fitxer:
+        with open(args.fitxer, encoding='utf-8') as f:
+            text = f.read()
 
-print("Longitud de clau probable:", key_len)
+    key_len, key, plaintext = crack_vigenere(text, args.max_len, args.idioma, args.kasiski, args.backend, args.processos)
 
-key = guess_key_spanish(ciphertext, key_len)
-print("Clau refinada:", key)
+    print("Longitud de clau probable:", key_len)
+    print("Clau refinada:", key)
+    print("\nText desxifrat:")
+    print(plaintext)
 
-plaintext = vigenere_decrypt(ciphertext, key)
-print("\nText desxifrat:")
-print(plaintext)
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark de la aplicación de mapeos de sustitución.
+
+Compara el bucle carácter a carácter original con el mapeo compilado de
+ex2_Desxifrar.py, usando solo la tabla de str.translate ('str') o la tabla
+de bytes ('compilado'), y con la forma por lotes (aplicar_mapeo_lote) a
+10 KB, 1 MB y 100 MB.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable, Dict, List
+
+from ex2_Desxifrar import (CIFRADO_SIMPLE, analizar_patron_sustitucion_simple, aplicar_mapeo_compilado,
+                           aplicar_mapeo_lote, compilar_mapeo)
+
+TAMANOS = {'10KB': 10 * 1024, '1MB': 1024 ** 2, '100MB': 100 * 1024 ** 2}
+# El bucle original es cuadrático en el peor caso: solo se mide hasta este tamaño
+LIMITE_BUCLE = 1024 ** 2
+TEXTOS_LOTE = 1000
+
+
+def aplicar_mapeo_caracter(texto: str, mapeo: Dict[str, str]) -> str:
+    """Implementación original de aplicar_mapeo, como referencia."""
+    resultado = ""
+    for char in texto.lower():
+        if char in mapeo:
+            resultado += mapeo[char]
+        else:
+            resultado += char
+    return resultado
+
+
+def generar_texto(tamano: int) -> str:
+    """Repite CIFRADO_SIMPLE hasta tener tamano caracteres."""
+    base = CIFRADO_SIMPLE + '\n'
+    return (base * (tamano // len(base) + 1))[:tamano]
+
+
+def cronometrar(funcion: Callable[[], object]) -> float:
+    inicio = time.perf_counter()
+    funcion()
+    return time.perf_counter() - inicio
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de aplicar_mapeo.")
+    parser.add_argument('-t', '--tamanos', nargs='+', choices=list(TAMANOS), default=list(TAMANOS),
+                        help="Tamaños a medir")
+    args = parser.parse_args()
+
+    mapeo = analizar_patron_sustitucion_simple(CIFRADO_SIMPLE)
+    print(f"{'tamaño':>8} {'bucle':>10} {'str':>10} {'compilado':>10} {'lote':>10} {'MB/s':>8}")
+    for nombre in args.tamanos:
+        tamano = TAMANOS[nombre]
+        texto = generar_texto(tamano)
+        trozos: List[str] = [texto[i:i + tamano // TEXTOS_LOTE] for i in range(0, tamano, tamano // TEXTOS_LOTE)]
+
+        bucle = '-'
+        if tamano <= LIMITE_BUCLE:
+            bucle = f"{cronometrar(lambda: aplicar_mapeo_caracter(texto, mapeo)):.4f}s"
+        tabla = compilar_mapeo(mapeo)
+        compilado = cronometrar(lambda: aplicar_mapeo_compilado(texto, tabla))
+        solo_str = cronometrar(lambda: aplicar_mapeo_compilado(texto, tabla._replace(tabla_bytes=None)))
+        lote = cronometrar(lambda: list(aplicar_mapeo_lote(trozos, mapeo)))
+        print(f"{nombre:>8} {bucle:>10} {solo_str:>9.4f}s {compilado:>9.4f}s {lote:>9.4f}s {tamano / 1024 ** 2 / compilado:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""
+Trencament de Cèsar per lots sobre fitxers i l'entrada estàndard
+Pràctica 1 - Criptografia
+EX1
+
+Llegeix textos xifrats separats per salts de línia (o per NUL amb -0), els
+trenca amb la puntuació chi-quadrat d'ex1.py i escriu un resultat JSONL per
+registre. L'entrada es llegeix per blocs: mai es carrega un fitxer sencer.
+"""
+
+import argparse
+import heapq
+import json
+import sys
+import time
+
+from ex1 import TAULES_CESAR, histograma_lletres, puntuar_desplaçaments
+
+MIDA_BLOC = 1 << 16
+MIDA_MAXIMA_REGISTRE = 1 << 20
+
+def llegir_registres(fitxer, separador=b'\n', mida_bloc=MIDA_BLOC, mida_maxima=MIDA_MAXIMA_REGISTRE):
+    """
+    Genera els registres d'un fitxer binari llegint-lo per blocs.
+
+    La memòria queda acotada per mida_bloc + mida_maxima: si un registre
+    supera mida_maxima, es talla i la resta fins al següent separador es descarta.
+
+    Args:
+        fitxer: Fitxer obert en mode binari
+        separador (bytes): Separador de registres (b'\\n' o b'\\0')
+        mida_bloc (int): Bytes llegits a cada lectura
+        mida_maxima (int): Mida màxima d'un registre
+
+    Yields:
+        tuple: (bytes del registre, True si s'ha tallat)
+    """
+    pendent = b''
+    descartant = False
+    while True:
+        bloc = fitxer.read(mida_bloc)
+        if not bloc:
+            break
+        parts = (pendent + bloc).split(separador)
+        pendent = parts.pop()
+        for part in parts:
+            if descartant:
+                descartant = False
+                continue
+            if len(part) > mida_maxima:
+                yield part[:mida_maxima], True
+            else:
+                yield part, False
+        if len(pendent) > mida_maxima:
+            if not descartant:
+                yield pendent[:mida_maxima], True
+                descartant = True
+            pendent = b''
+    if pendent and not descartant:
+        yield pendent, False
+
+def trencar_registre(text, top=3, amb_text=False, idioma=None):
+    """
+    Trenca un text xifrat i retorna el resultat com a diccionari serialitzable.
+
+    Args:
+        text (str): Text xifrat
+        top (int): Nombre d'alternatives a incloure (millor inclosa)
+        amb_text (bool): Afegir el text desxifrat amb el millor desplaçament
+        idioma (str): Codi del model de n-grames (None = anglès)
+
+    Returns:
+        dict: Desplaçament, chi-quadrat i alternatives ordenades
+    """
+    chi_quadrats = puntuar_desplaçaments(histograma_lletres(text), idioma)
+    millors = heapq.nsmallest(max(top, 1), range(26), key=chi_quadrats.__getitem__)
+    resultat = {
+        'desplaçament': millors[0],
+        'chi': chi_quadrats[millors[0]],
+        'alternatives': [{'desplaçament': d, 'chi': chi_quadrats[d]} for d in millors[1:top]],
+    }
+    if amb_text:
+        resultat['text'] = text.translate(TAULES_CESAR[millors[0]])
+    return resultat
+
+def processar(fitxers, sortida, separador=b'\n', top=3, amb_text=False, progres=0, idioma=None):
+    """
+    Trenca tots els registres dels fitxers i escriu una línia JSON per registre.
+
+    Args:
+        fitxers (list): Fitxers binaris d'entrada
+        sortida: Fitxer de text on escriure el JSONL
+        separador (bytes): Separador de registres
+        top (int): Alternatives per registre
+        amb_text (bool): Incloure el text desxifrat
+        progres (int): Cada quants registres informar per stderr (0 = mai)
+        idioma (str): Codi del model de n-grames (None = anglès)
+
+    Returns:
+        tuple: (registres processats, segons transcorreguts)
+    """
+    inici = time.perf_counter()
+    registres = 0
+    for num_fitxer, fitxer in enumerate(fitxers):
+        for num, (dades, tallat) in enumerate(llegir_registres(fitxer, separador)):
+            text = dades.decode('utf-8', errors='replace')
+            if separador == b'\n':
+                text = text.rstrip('\r')
+            if not text.strip():
+                continue
+            resultat = {'fitxer': num_fitxer, 'registre': num}
+            resultat.update(trencar_registre(text, top, amb_text, idioma))
+            if tallat:
+                resultat['tallat'] = True
+            sortida.write(json.dumps(resultat, ensure_ascii=False) + '\n')
+            registres += 1
+            if progres and registres % progres == 0:
+                segons = time.perf_counter() - inici
+                print(f"{registres} registres ({registres / segons:.0f} registres/s)", file=sys.stderr)
+    return registres, time.perf_counter() - inici
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Trenca textos xifrats amb Cèsar per lots i escriu JSONL.")
+    parser.add_argument('fitxers', nargs='*', default=['-'], help="Fitxers d'entrada ('-' per stdin)")
+    parser.add_argument('-0', '--nul', action='store_true', help="Registres separats per NUL en lloc de salts de línia")
+    parser.add_argument('-k', '--top', type=int, default=3, help="Nombre de candidats per registre")
+    parser.add_argument('-t', '--amb-text', action='store_true', help="Incloure el text desxifrat")
+    parser.add_argument('-o', '--sortida', default='-', help="Fitxer JSONL de sortida ('-' per stdout)")
+    parser.add_argument('-i', '--idioma', help="Model de n-grames de l'idioma (per defecte, anglès)")
+    parser.add_argument('--progres', type=int, default=0, help="Informar cada N registres per stderr")
+    args = parser.parse_args(argv)
+
+    separador = b'\0' if args.nul else b'\n'
+    fitxers = [sys.stdin.buffer if nom == '-' else open(nom, 'rb') for nom in args.fitxers]
+    sortida = sys.stdout if args.sortida == '-' else open(args.sortida, 'w', encoding='utf-8')
+    try:
+        registres, segons = processar(fitxers, sortida, separador, args.top, args.amb_text, args.progres, args.idioma)
+    finally:
+        for fitxer in fitxers:
+            if fitxer is not sys.stdin.buffer:
+                fitxer.close()
+        if sortida is not sys.stdout:
+            sortida.close()
+
+    velocitat = registres / segons if segons > 0 else 0.0
+    print(f"{registres} registres en {segons:.2f} s ({velocitat:.0f} registres/s)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
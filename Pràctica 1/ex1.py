@@ -4,7 +4,9 @@ Pràctica 1 - Criptografia
 EX1
 """
 
+import importlib.util
 from collections import Counter
+from functools import lru_cache
 
 # Freqüències de lletres en anglès (en percentatge)
 FREQUENCIES_ENGLISH = {
@@ -49,26 +51,68 @@ def mostrar_comptatge(frequencies):
     for char, count in sorted_freq:
         print(f"{char}: {count}")
 
-def calcular_chi_quadrat(frequencies_observades, total_lletres):
+def frequencies_idioma(idioma=None):
+    """
+    Retorna les freqüències (en percentatge) de les lletres A-Z d'un idioma.
+    
+    Args:
+        idioma (str): Codi del model de n-grames (None = taula de l'anglès)
+    
+    Returns:
+        dict: Percentatge de cada lletra majúscula
+    """
+    if idioma is None:
+        return FREQUENCIES_ENGLISH
+    from modelo_ngramas import cargar_modelo
+    probabilitats = cargar_modelo(idioma).unigramas(ALFABET.lower())
+    return {lletra.upper(): p * 100 for lletra, p in probabilitats.items()}
+
+# Entrades de la memòria cau de vectors esperats: (idioma, total de lletres, desplaçament)
+MIDA_CAU = 4096
+
+@lru_cache(maxsize=MIDA_CAU)
+def comptatges_esperats(idioma, total_lletres, desplaçament=0):
+    """
+    Comptatges esperats de les lletres A-Z en un text de total_lletres lletres.
+    
+    Amb desplaçament d, la posició j conté l'esperat de la lletra (j - d) % 26:
+    és el vector a comparar directament amb l'histograma d'un text xifrat amb d.
+    Memòria cau LRU (comptatges_esperats.cache_info() dona encerts i fallades).
+    
+    Args:
+        idioma (str): Codi del model de n-grames (None = anglès)
+        total_lletres (int): Total de lletres del text
+        desplaçament (int): Rotació del vector
+    
+    Returns:
+        tuple: 26 comptatges esperats
+    """
+    if desplaçament % 26:
+        base = comptatges_esperats(idioma, total_lletres)
+        d = desplaçament % 26
+        return base[-d:] + base[:-d]
+    frequencies = frequencies_idioma(idioma)
+    return tuple((frequencies[lletra] / 100.0) * total_lletres for lletra in ALFABET)
+
+def calcular_chi_quadrat(frequencies_observades, total_lletres, idioma=None):
     """
     Calcula l'estadístic chi-quadrat per comparar amb les freqüències de l'anglès.
     
     Args:
         frequencies_observades (dict): Freqüències observades en el text
         total_lletres (int): Total de lletres en el text
+        idioma (str): Codi del model de n-grames a fer servir en lloc de l'anglès
     
     Returns:
         float: Valor de chi-quadrat (menor valor indica millor ajust a l'anglès)
     """
     chi_quadrat = 0.0
+    esperades = comptatges_esperats(idioma, total_lletres)
     
-    for lletra in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ':
+    for lletra, esperada in zip(ALFABET, esperades):
         # Freqüència observada
         observada = frequencies_observades.get(lletra, 0)
         
-        # Freqüència esperada segons l'anglès
-        esperada = (FREQUENCIES_ENGLISH[lletra] / 100.0) * total_lletres
-        
         # Evitar divisió per zero
         if esperada > 0:
             chi_quadrat += ((observada - esperada) ** 2) / esperada
@@ -120,6 +164,184 @@ def desxifrat_cesar(text, desplaçament):
     
     return result
 
+ALFABET = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+def construir_taula_cesar(desplaçament):
+    """
+    Construeix la taula de traducció (str.translate) per desxifrar amb un desplaçament.
+    
+    Args:
+        desplaçament (int): Desplaçament desxifrat (s'aplica restant-lo a cada lletra)
+    
+    Returns:
+        dict: Taula de traducció que manté majúscules i minúscules
+    """
+    rotat = ALFABET[desplaçament % 26:] + ALFABET[:desplaçament % 26]
+    return str.maketrans(rotat + rotat.lower(), ALFABET + ALFABET.lower())
+
+# Una taula per a cada desplaçament, construïdes una sola vegada
+TAULES_CESAR = [construir_taula_cesar(d) for d in range(26)]
+
+def histograma_lletres(text):
+    """
+    Compta una sola vegada les lletres A-Z del text (sense distingir majúscules).
+    
+    Args:
+        text (str): Text a analitzar
+    
+    Returns:
+        list: Llista de 26 comptatges, un per lletra de l'alfabet
+    """
+    text_majuscules = text.upper()
+    return [text_majuscules.count(lletra) for lletra in ALFABET]
+
+def puntuar_desplaçaments(histograma, idioma=None):
+    """
+    Calcula el chi-quadrat dels 26 desplaçaments rotant l'histograma del text xifrat.
+    
+    Desxifrar amb el desplaçament d converteix la lletra xifrada (j + d) en j,
+    de manera que no cal reconstruir ni recomptar cap text candidat.
+    
+    Args:
+        histograma (list): Comptatge de les 26 lletres del text xifrat
+        idioma (str): Codi del model de n-grames (None = anglès)
+    
+    Returns:
+        list: Valor de chi-quadrat per a cada desplaçament (índex 0..25)
+    """
+    total_lletres = sum(histograma)
+    resultats = []
+    for d in range(26):
+        # L'histograma es compara amb el vector esperat rotat, sense rotar-lo ni fer-ne un diccionari
+        chi_quadrat = 0.0
+        for observada, esperada in zip(histograma, comptatges_esperats(idioma, total_lletres, d)):
+            if esperada > 0:
+                chi_quadrat += ((observada - esperada) ** 2) / esperada
+        resultats.append(chi_quadrat)
+    return resultats
+
+def trencar_cesar(text, idioma=None):
+    """
+    Troba el millor desplaçament i desxifra només el text guanyador.
+    
+    Args:
+        text (str): Text xifrat
+        idioma (str): Codi del model de n-grames (None = anglès)
+    
+    Returns:
+        tuple: (desplaçament, chi-quadrat, text desxifrat)
+    """
+    chi_quadrats = puntuar_desplaçaments(histograma_lletres(text), idioma)
+    millor = min(range(26), key=chi_quadrats.__getitem__)
+    return millor, chi_quadrats[millor], text.translate(TAULES_CESAR[millor])
+
+# --- LOTS (NumPy) ---
+# NumPy és opcional: s'importa el primer cop que es fa servir l'API de lots
+_np = None
+
+def _numpy():
+    global _np
+    if _np is None:
+        import numpy
+        _np = numpy
+    return _np
+
+def numpy_disponible():
+    return _np is not None or importlib.util.find_spec('numpy') is not None
+
+# Codis de lletra: A-Z i a-z -> 0..25; la resta de caràcters (i el farciment) -> 26
+CODIS_LLETRES = bytes(ALFABET.find(chr(b).upper()) if chr(b).isascii() and chr(b).upper() in ALFABET else 26
+                      for b in range(256))
+
+def empaquetar_textos(textos):
+    """
+    Empaqueta molts textos en una matriu d'enters farcida i un vector de longituds.
+    
+    Args:
+        textos (list): Textos (xifrats)
+    
+    Returns:
+        tuple: (matriu uint8 de mida textos x longitud màxima amb els codis
+        0..25 de les lletres i 26 per a la resta i el farciment, longituds)
+    """
+    np = _numpy()
+    codificats = [text.encode('ascii', errors='replace').translate(CODIS_LLETRES) for text in textos]
+    longituds = np.array([len(c) for c in codificats], dtype=np.int64)
+    amplada = int(longituds.max()) if len(codificats) else 0
+    matriu = np.full((len(codificats), amplada), 26, dtype=np.uint8)
+    matriu[np.arange(amplada) < longituds[:, None]] = np.frombuffer(b''.join(codificats), dtype=np.uint8)
+    return matriu, longituds
+
+def histogrames_lot(matriu):
+    """
+    Histograma de les 26 lletres de cada fila amb un sol bincount.
+    
+    Returns:
+        ndarray: Matriu files x 26 de comptatges
+    """
+    np = _numpy()
+    files = matriu.shape[0]
+    index = matriu.astype(np.int64) + 27 * np.arange(files)[:, None]
+    return np.bincount(index.ravel(), minlength=27 * files).reshape(files, 27)[:, :26]
+
+@lru_cache(maxsize=16)
+def taula_inverses(idioma=None):
+    """
+    Probabilitats p de l'idioma i la taula rotada inverses[k, d] = 1 / p[(k - d) % 26].
+    
+    Es calcula un cop per idioma (memòria cau LRU); els arrays retornats no s'han de modificar.
+    """
+    np = _numpy()
+    frequencies = frequencies_idioma(idioma)
+    p = np.array([frequencies[lletra] / 100.0 for lletra in ALFABET])
+    files = np.arange(26)
+    # La lletra xifrada k passa a ser k - d
+    return p, 1.0 / p[(files[:, None] - files[None, :]) % 26]
+
+def puntuar_desplaçaments_lot(histogrames, idioma=None):
+    """
+    Chi-quadrat dels 26 desplaçaments de cada fila, com a producte de matrius.
+    
+    Per al desplaçament d la lletra j observada és histograma[(j + d) % 26] i
+    sum((o - e)² / e) = sum(o² / e) - 2N + N·sum(p), amb e = p·N.
+    
+    Args:
+        histogrames (ndarray): Matriu files x 26 (histograma_lletres de cada text)
+        idioma (str): Codi del model de n-grames (None = anglès)
+    
+    Returns:
+        ndarray: Matriu files x 26 amb el mateix valor que puntuar_desplaçaments
+    """
+    np = _numpy()
+    p, inverses = taula_inverses(idioma)
+    N = histogrames.sum(axis=1, keepdims=True).astype(float)
+    chi = (histogrames.astype(float) ** 2) @ inverses / np.maximum(N, 1) - 2 * N + N * p.sum()
+    return np.where(N > 0, chi, 0.0)
+
+def trencar_cesar_lot(textos, idioma=None, desxifrar=False):
+    """
+    Trenca molts textos xifrats amb Cèsar alhora, com trencar_cesar per a cadascun.
+    
+    Args:
+        textos (list): Textos xifrats
+        idioma (str): Codi del model de n-grames (None = anglès)
+        desxifrar (bool): Retornar també els textos desxifrats
+    
+    Returns:
+        ndarray: Array estructurat amb els camps 'desplaçament' i 'chi_quadrat'
+        per a cada text (i, amb desxifrar, una tupla amb la llista de textos)
+    """
+    np = _numpy()
+    matriu, _ = empaquetar_textos(textos)
+    chi = puntuar_desplaçaments_lot(histogrames_lot(matriu), idioma)
+    millors = chi.argmin(axis=1)
+    resultat = np.empty(len(textos), dtype=[('desplaçament', np.int64), ('chi_quadrat', np.float64)])
+    resultat['desplaçament'] = millors
+    resultat['chi_quadrat'] = chi[np.arange(len(textos)), millors]
+    if desxifrar:
+        return resultat, [text.translate(TAULES_CESAR[d]) for text, d in zip(textos, millors.tolist())]
+    return resultat
+
 def main():
     # Text xifrat
     text_xifrat = """T SLGP DPPY ESTYRD JZF APZAWP HZFWO YZE MPWTPGP, LEELNV DSTAD
@@ -150,28 +372,18 @@ MP WZDE TY ETXP, WTVP EPLCD TY CLTY. ETXP EZ OTP."""
     print("\nANÀLISI DE TOTS ELS DESPLAÇAMENTS:")
     print("=" * 50)
     
-    millor_desplaçament = 0
-    millor_chi_quadrat = float('inf')
-    resultats_analisi = []
-    
-    for i in range(1, 26):
-        desxifrat = desxifrat_cesar(text_xifrat, -i)
-        freq_desxifrat = comptar_lletres(desxifrat)
-        total_lletres = sum(freq_desxifrat.values())
-        
-        chi_quadrat = calcular_chi_quadrat(freq_desxifrat, total_lletres)
-        resultats_analisi.append((i, chi_quadrat, desxifrat))
-        
-        if chi_quadrat < millor_chi_quadrat:
-            millor_chi_quadrat = chi_quadrat
-            millor_desplaçament = i
+    # Un sol histograma del text xifrat serveix per a tots els desplaçaments
+    chi_quadrats = puntuar_desplaçaments(histograma_lletres(text_xifrat))
+    millor_desplaçament = min(range(1, 26), key=chi_quadrats.__getitem__)
     
     # Ordenar per chi-quadrat (millor ajust primer)
-    resultats_analisi.sort(key=lambda x: x[1])
+    resultats_analisi = sorted(range(1, 26), key=chi_quadrats.__getitem__)
     
     print("MILLORS CANDIDATS (ordenats per similitud amb l'anglès):")
     print("-" * 60)
-    for i, (desplaçament, chi_val, text_desxifrat) in enumerate(resultats_analisi[:5]):
+    for i, desplaçament in enumerate(resultats_analisi[:5]):
+        chi_val = chi_quadrats[desplaçament]
+        text_desxifrat = text_xifrat.translate(TAULES_CESAR[desplaçament])
         print(f"{i+1}. Clau {desplaçament:2d} (χ² = {chi_val:8.2f}):")
         # Mostrar només les primeres línies per estalviar espai
         primera_linia = text_desxifrat.split('\n')[0]
@@ -181,7 +393,7 @@ MP WZDE TY ETXP, WTVP EPLCD TY CLTY. ETXP EZ OTP."""
     print(f"MILLOR CANDIDAT: Desplaçament {millor_desplaçament}")
     print(f"CLAU DE DESXIFRAT: {millor_desplaçament}")
     print("=" * 50)
-    millor_text = desxifrat_cesar(text_xifrat, -millor_desplaçament)
+    millor_text = text_xifrat.translate(TAULES_CESAR[millor_desplaçament])
     print(millor_text)
     
     # Provar tots els desplaçaments
@@ -189,7 +401,7 @@ MP WZDE TY ETXP, WTVP EPLCD TY CLTY. ETXP EZ OTP."""
     print("=" * 50)
     
     for i in range(1, 26):
-        desxifrat = desxifrat_cesar(text_xifrat, -i)
+        desxifrat = text_xifrat.translate(TAULES_CESAR[i])
         print(f"Clau {i:2d}: {desxifrat}")
 
 if __name__ == "__main__":
@@ -6,10 +6,14 @@ Compareu les freqüències d’aparició dels caràcters d’un i altre mètode.
 """
 from __future__ import annotations
 
+import heapq
+import importlib.util
 import math
 import random
+import sys
+from array import array
 from collections import Counter, defaultdict
-from typing import Dict, List, Tuple
+from typing import IO, Any, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
 
 PLAINTEXT = """
@@ -73,23 +77,62 @@ def encrypt_simple(text: str, mapping: Dict[str, str]) -> str:
 	return ''.join(out)
 
 
-def allocate_homophones(letters: List[str], freqs: Dict[str, int], total_tokens: int, seed: int = 42) -> Dict[str, List[str]]:
+def largest_remainder_counts(letters: List[str], freqs: Dict[str, int], total_tokens: int, tie_seed: Optional[int] = None) -> Dict[str, int]:
+	"""Split total_tokens among letters with the largest-remainder (Hamilton) method.
+
+	Every letter gets one symbol; the rest are shared in proportion to freqs.
+	Each letter first takes the floor of its quota and the leftovers go, one
+	each, to the letters with the largest fractional remainders. Ties are
+	broken by letter order, or by a shuffle seeded with tie_seed.
+	"""
+	n = len(letters)
+	counts = {L: 1 for L in letters}
+	remaining = max(total_tokens - n, 0)
+	total_freq = sum(freqs.get(L, 0) for L in letters)
+	if remaining == 0 or n == 0:
+		return counts
+	if total_freq == 0:
+		quotas = {L: remaining / n for L in letters}
+	else:
+		quotas = {L: freqs.get(L, 0) * remaining / total_freq for L in letters}
+	for L, quota in quotas.items():
+		counts[L] += int(quota)
+	leftovers = remaining - sum(int(q) for q in quotas.values())
+	order = list(letters)
+	if tie_seed is not None:
+		random.Random(tie_seed).shuffle(order)
+	order.sort(key=lambda L: quotas[L] - int(quotas[L]), reverse=True)
+	for L in order[:leftovers]:
+		counts[L] += 1
+	return counts
+
+
+def allocate_homophones(letters: List[str], freqs: Dict[str, int], total_tokens: int, seed: int = 42,
+		pool: Optional[Sequence[str]] = None, method: str = 'random') -> Dict[str, List[str]]:
 	"""Allocate single-character homophone symbols among plaintext letters.
 
 	The ciphertext alphabet is drawn from a pool of letters, digits, punctuation
 	and a selection of accented letters. Each plaintext letter receives one or
 	more single-character homophones. If the requested pool size is larger than
 	the available symbol pool, it is reduced.
+
+	A custom pool of tokens (of any length, e.g. from make_token_pool) can be
+	given instead. method='largest_remainder' replaces the weighted random
+	spreading of leftover symbols with largest_remainder_counts, using seed to
+	break ties.
 	"""
 	rand = random.Random(seed)
-	# candidate pool of single-character symbols (letters, digits, punctuation,
-	# some accented letters). This should be large enough for typical total_tokens.
-	candidate = list(
-		"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
-		"!\"#$%&'()*+,-./:;<=>?@[\\]^_`{|}~¡¿áéíóúÁÉÍÓÚàèìòùñÑçÇœŒß"
-	)
-	# ensure unique
-	candidate = sorted(set(candidate), key=lambda x: rand.random())
+	if pool is None:
+		# candidate pool of single-character symbols (letters, digits, punctuation,
+		# some accented letters). This should be large enough for typical total_tokens.
+		candidate = list(
+			"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+			"!\"#$%&'()*+,-./:;<=>?@[\\]^_`{|}~¡¿áéíóúÁÉÍÓÚàèìòùñÑçÇœŒß"
+		)
+		# ensure unique
+		candidate = sorted(set(candidate), key=lambda x: rand.random())
+	else:
+		candidate = list(dict.fromkeys(pool))
 	if total_tokens > len(candidate):
 		total_tokens = len(candidate)
 
@@ -97,6 +140,28 @@ def allocate_homophones(letters: List[str], freqs: Dict[str, int], total_tokens:
 	if total_tokens < n:
 		total_tokens = n
 
+	if method == 'largest_remainder':
+		allocation = largest_remainder_counts(letters, freqs, total_tokens, tie_seed=seed)
+	elif method == 'random':
+		allocation = _random_leftover_counts(letters, freqs, total_tokens, rand)
+	else:
+		raise ValueError(f"unknown allocation method: {method!r}")
+
+	# assign actual symbols
+	rand.shuffle(candidate)
+	out: Dict[str, List[str]] = {}
+	idx = 0
+	for L in letters:
+		cnt = allocation[L]
+		out[L] = candidate[idx: idx + cnt]
+		idx += cnt
+	return out
+
+
+def _random_leftover_counts(letters: List[str], freqs: Dict[str, int], total_tokens: int, rand: random.Random) -> Dict[str, int]:
+	"""Original allocation: floors of the quotas plus leftovers drawn at random,
+	weighted by the rounded fractional parts."""
+	n = len(letters)
 	# base assign 1 per letter
 	allocation = {L: 1 for L in letters}
 	remaining = total_tokens - n
@@ -126,16 +191,13 @@ def allocate_homophones(letters: List[str], freqs: Dict[str, int], total_tokens:
 			for i in range(leftovers):
 				pick = rand.choice(choices)
 				allocation[pick] += 1
+	return allocation
 
-	# assign actual single-character symbols
-	rand.shuffle(candidate)
-	out: Dict[str, List[str]] = {}
-	idx = 0
-	for L in letters:
-		cnt = allocation[L]
-		out[L] = candidate[idx: idx + cnt]
-		idx += cnt
-	return out
+
+def make_token_pool(size: int, prefix: str = '') -> List[str]:
+	"""Return size distinct multi-character tokens ('000', '001', ...), all the same width."""
+	width = len(str(max(size - 1, 0)))
+	return [f"{prefix}{i:0{width}d}" for i in range(size)]
 
 
 def encrypt_homophonic(text: str, homo_map: Dict[str, List[str]], seed: int = 42) -> str:
@@ -158,6 +220,442 @@ def token_freqs_homophonic(ciphertext: str, pool: List[str]) -> Counter:
 	return Counter(ch for ch in ciphertext if ch in pool_set)
 
 
+# --- token ciphertext: homophones as integer IDs (uint16) ---
+# IDs below LITERAL_BASE are homophones; LITERAL_BASE + ord(ch) carries a
+# character that is not encrypted (spaces, punctuation, digits) unchanged.
+# Characters above MAX_LITERAL are written as ESCAPE_TOKEN followed by two
+# words with the high and low 16 bits of the code point.
+LITERAL_BASE = 0xF000
+ESCAPE_TOKEN = 0xFFFF
+MAX_LITERAL = ESCAPE_TOKEN - 1 - LITERAL_BASE
+TOKEN_SEPARATOR = ' '
+
+
+def token_key_from_allocation(homo_alloc: Dict[str, List[str]]) -> Tuple[Dict[str, List[int]], List[str]]:
+	"""Number the homophones of an allocation as integer IDs.
+
+	IDs follow the sorted order of the symbols, so with a shuffled pool (see
+	allocate_homophones) they carry no information about the letter.
+
+	Returns:
+		(letter -> list of IDs, list id -> letter)
+	"""
+	symbols = sorted(sym for syms in homo_alloc.values() for sym in syms)
+	if len(symbols) > LITERAL_BASE:
+		raise ValueError(f'{len(symbols)} homophones: at most {LITERAL_BASE} fit in a uint16 token')
+	ids = {sym: i for i, sym in enumerate(symbols)}
+	token_key = {letter: [ids[sym] for sym in syms] for letter, syms in homo_alloc.items()}
+	id_to_letter = [''] * len(symbols)
+	for letter, token_ids in token_key.items():
+		for i in token_ids:
+			id_to_letter[i] = letter
+	return token_key, id_to_letter
+
+
+def _literal_tokens(ch: str) -> Tuple[int, ...]:
+	code = ord(ch)
+	if code > MAX_LITERAL:
+		return (ESCAPE_TOKEN, code >> 16, code & 0xFFFF)
+	return (LITERAL_BASE + code,)
+
+
+def encrypt_homophonic_tokens(chunks: Iterable[str], token_key: Dict[str, List[int]], seed: int = 42) -> Iterator[array]:
+	"""Encrypt a stream of text chunks into arrays of uint16 token IDs.
+
+	Homophones are drawn exactly as in encrypt_homophonic (one rand.choice per
+	letter from a single generator), so how the text is split into chunks does
+	not change the output.
+	"""
+	rand = random.Random(seed)
+	literals: Dict[str, int] = {}
+	for chunk in chunks:
+		out = array('H')
+		for ch in chunk:
+			token_ids = token_key.get(ch.lower())
+			if token_ids is not None:
+				out.append(rand.choice(token_ids))
+			else:
+				literal = literals.get(ch)
+				if literal is None:
+					literal = literals[ch] = _literal_tokens(ch)
+				out.extend(literal)
+		yield out
+
+
+def decrypt_homophonic_tokens(token_chunks: Iterable[Sequence[int]], id_to_letter: List[str]) -> Iterator[str]:
+	"""Decrypt a stream of token ID arrays back to text (letters in lowercase).
+
+	An escape sequence may be split across arrays.
+	"""
+	escaped: List[int] = []
+	for tokens in token_chunks:
+		if not escaped and ESCAPE_TOKEN not in tokens:
+			yield ''.join([id_to_letter[t] if t < LITERAL_BASE else chr(t - LITERAL_BASE) for t in tokens])
+			continue
+		out = []
+		for t in tokens:
+			if escaped:
+				escaped.append(t)
+				if len(escaped) == 3:
+					out.append(chr(escaped[1] << 16 | escaped[2]))
+					escaped = []
+			elif t == ESCAPE_TOKEN:
+				escaped = [t]
+			elif t < LITERAL_BASE:
+				out.append(id_to_letter[t])
+			else:
+				out.append(chr(t - LITERAL_BASE))
+		yield ''.join(out)
+	if escaped:
+		raise ValueError('truncated token stream: escape token without its code point')
+
+
+def token_freqs_from_ids(token_chunks: Iterable[Sequence[int]]) -> Counter:
+	"""Count homophone IDs (literal tokens excluded) over a stream of token arrays."""
+	counts: Counter = Counter()
+	# words still to skip after an escape token (the code point, not homophones)
+	skip = 0
+	for tokens in token_chunks:
+		if not skip and ESCAPE_TOKEN not in tokens:
+			counts.update(tokens)
+			continue
+		for t in tokens:
+			if skip:
+				skip -= 1
+			elif t == ESCAPE_TOKEN:
+				skip = 2
+			else:
+				counts[t] += 1
+	for t in [t for t in counts if t >= LITERAL_BASE]:
+		del counts[t]
+	return counts
+
+
+def write_tokens_binary(f: IO[bytes], token_chunks: Iterable[array]) -> int:
+	"""Write token arrays as little-endian uint16; returns the number of tokens written."""
+	written = 0
+	for tokens in token_chunks:
+		if sys.byteorder != 'little':
+			tokens = array('H', tokens)
+			tokens.byteswap()
+		tokens.tofile(f)
+		written += len(tokens)
+	return written
+
+
+def read_tokens_binary(f: IO[bytes], chunk_tokens: int = 1 << 16) -> Iterator[array]:
+	"""Read a little-endian uint16 token file in arrays of up to chunk_tokens IDs."""
+	while True:
+		data = f.read(2 * chunk_tokens)
+		if not data:
+			return
+		if len(data) % 2:
+			raise ValueError('truncated token file: odd number of bytes')
+		tokens = array('H', data)
+		if sys.byteorder != 'little':
+			tokens.byteswap()
+		yield tokens
+
+
+def write_tokens_text(f: IO[str], token_chunks: Iterable[Sequence[int]], sep: str = TOKEN_SEPARATOR) -> int:
+	"""Write token IDs as decimal numbers joined by sep; returns the number of tokens written."""
+	written = 0
+	for tokens in token_chunks:
+		if not len(tokens):
+			continue
+		if written:
+			f.write(sep)
+		f.write(sep.join(map(str, tokens)))
+		written += len(tokens)
+	return written
+
+
+def read_tokens_text(f: IO[str], sep: Optional[str] = None, chunk_chars: int = 1 << 16) -> Iterator[array]:
+	"""Parse a delimited token file in chunks (sep=None splits on any whitespace)."""
+	pending = ''
+	while True:
+		data = f.read(chunk_chars)
+		if not data:
+			break
+		text = pending + data
+		fields = text.split(sep)
+		# the last field may continue in the next chunk
+		pending = fields.pop() if fields and (sep is not None or not text[-1].isspace()) else ''
+		yield array('H', [int(x) for x in fields if x])
+	if pending.strip():
+		yield array('H', [int(pending)])
+
+
+# --- bulk pipeline: chunked encryption of files or iterables of records ---
+CHUNK_CHARS = 1 << 20
+
+# numpy is optional: loaded on first use by the homophonic encoder
+_np = None
+
+
+def _numpy():
+	global _np
+	if _np is None:
+		import numpy
+		_np = numpy
+	return _np
+
+
+def numpy_available() -> bool:
+	return _np is not None or importlib.util.find_spec('numpy') is not None
+
+
+def read_chunks(path: str, chunk_chars: int = CHUNK_CHARS, encoding: str = 'utf-8') -> Iterator[str]:
+	"""Yield the text of a file in chunks of up to chunk_chars characters."""
+	with open(path, encoding=encoding, newline='') as f:
+		while True:
+			chunk = f.read(chunk_chars)
+			if not chunk:
+				return
+			yield chunk
+
+
+def compile_simple_table(mapping: Dict[str, str]) -> Dict[int, str]:
+	"""str.translate table equivalent to encrypt_simple (case preserved)."""
+	table: Dict[int, str] = {}
+	for p, c in mapping.items():
+		if not (p.isalpha() and len(p) == 1):
+			continue
+		table[ord(p)] = c
+		upper = p.upper()
+		if len(upper) == 1 and upper != p and upper.lower() == p:
+			table[ord(upper)] = c.upper()
+	return table
+
+
+def encrypt_simple_stream(chunks: Iterable[str], mapping: Dict[str, str]) -> Iterator[str]:
+	"""Encrypt text chunks (or records) with a simple substitution, one translate per chunk."""
+	table = compile_simple_table(mapping)
+	for chunk in chunks:
+		yield chunk.translate(table)
+
+
+class HomophonicEncoder:
+	"""Chunked homophonic encryption with a block-drawn random stream.
+
+	Each letter consumes one 32-bit word of random.Random(seed), drawn in one
+	getrandbits() call per chunk, and picks homophone (word * k) >> 32 of its
+	k symbols. The words are consumed in text order, so the output for a seed
+	does not depend on how the text is split; the numpy backend (single
+	character symbols) and the pure Python one produce the same ciphertext.
+	The stream differs from the one used by encrypt_homophonic.
+	"""
+
+	def __init__(self, homo_map: Dict[str, List[str]], seed: int = 42, backend: str = 'auto'):
+		self._seed(seed)
+		self.symbols = [sym for syms in homo_map.values() for sym in syms]
+		# letter (both cases, as encrypt_homophonic lowercases) -> (offset, count) in symbols
+		self.slots: Dict[str, Tuple[int, int]] = {}
+		offset = 0
+		for letter, syms in homo_map.items():
+			if letter.isalpha() and syms:
+				self.slots[letter] = (offset, len(syms))
+				upper = letter.upper()
+				if len(upper) == 1 and upper.lower() == letter:
+					self.slots.setdefault(upper, (offset, len(syms)))
+			offset += len(syms)
+		single = all(len(sym) == 1 for sym in self.symbols)
+		if backend == 'auto':
+			backend = 'numpy' if single and numpy_available() else 'python'
+		if backend == 'numpy' and not single:
+			raise ValueError('the numpy backend needs single-character symbols')
+		self.backend = backend
+		if backend == 'numpy':
+			self._compile_numpy()
+
+	def _compile_numpy(self) -> None:
+		np = _numpy()
+		size = max(ord(ch) for ch in self.slots) + 2 if self.slots else 1
+		# codepoint -> offset / count; the last entry catches every codepoint above
+		self._offsets = np.zeros(size, dtype=np.uint64)
+		self._counts = np.zeros(size, dtype=np.uint64)
+		for ch, (offset, count) in self.slots.items():
+			self._offsets[ord(ch)] = offset
+			self._counts[ord(ch)] = count
+		self._symbol_codes = np.array([ord(sym) for sym in self.symbols], dtype=np.uint32)
+
+	def _seed(self, seed: int) -> None:
+		"""Set up the random stream the word methods draw from."""
+		self.rand = random.Random(seed)
+
+	def _words(self, n: int) -> bytes:
+		return self.rand.getrandbits(32 * n).to_bytes(4 * n, 'little') if n else b''
+
+	def _python_words(self, positions: List[int]) -> Sequence[int]:
+		"""One 32-bit word per letter; positions are the letters' offsets in the chunk."""
+		words = array('I', self._words(len(positions)))
+		if sys.byteorder != 'little':
+			words.byteswap()
+		return words
+
+	def _numpy_words(self, positions):
+		np = _numpy()
+		return np.frombuffer(self._words(len(positions)), dtype='<u4').astype(np.uint64)
+
+	def encrypt(self, chunk: str) -> str:
+		if self.backend == 'numpy':
+			return self._encrypt_numpy(chunk)
+		slots = self.slots
+		positions = [i for i, ch in enumerate(chunk) if ch in slots]
+		if not positions:
+			return chunk
+		out = list(chunk)
+		symbols = self.symbols
+		for i, word in zip(positions, self._python_words(positions)):
+			offset, count = slots[chunk[i]]
+			out[i] = symbols[offset + (word * count >> 32)]
+		return ''.join(out)
+
+	def _encrypt_numpy(self, chunk: str) -> str:
+		np = _numpy()
+		codes = np.frombuffer(chunk.encode('utf-32-le'), dtype=np.uint32)
+		clipped = np.minimum(codes, len(self._counts) - 1)
+		counts = self._counts[clipped]
+		letters = np.flatnonzero(counts)
+		if not len(letters):
+			return chunk
+		words = self._numpy_words(letters)
+		picks = self._offsets[clipped[letters]] + ((words * counts[letters]) >> np.uint64(32))
+		out = codes.copy()
+		out[letters] = self._symbol_codes[picks]
+		return out.tobytes().decode('utf-32-le')
+
+	def stream(self, chunks: Iterable[str]) -> Iterator[str]:
+		for chunk in chunks:
+			yield self.encrypt(chunk)
+
+
+def encrypt_homophonic_stream(chunks: Iterable[str], homo_map: Dict[str, List[str]], seed: int = 42,
+		backend: str = 'auto') -> Iterator[str]:
+	"""Encrypt text chunks (or records) with HomophonicEncoder."""
+	return HomophonicEncoder(homo_map, seed, backend).stream(chunks)
+
+
+# Counter-based mode: the word of the character at position i is a keyed hash
+# of (seed, i) (splitmix64), so any range can be encrypted on its own
+SPLITMIX_GAMMA = 0x9E3779B97F4A7C15
+MASK64 = (1 << 64) - 1
+
+
+def splitmix64(x: int) -> int:
+	"""splitmix64 finalizer of a 64-bit integer."""
+	x = (x ^ (x >> 30)) * 0xBF58476D1CE4E5B9 & MASK64
+	x = (x ^ (x >> 27)) * 0x94D049BB133111EB & MASK64
+	return x ^ (x >> 31)
+
+
+def _splitmix64_np(x):
+	np = _numpy()
+	x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+	x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+	return x ^ (x >> np.uint64(31))
+
+
+class CounterHomophonicEncoder(HomophonicEncoder):
+	"""HomophonicEncoder whose word for text position i is splitmix64(key + (i + 1) * gamma) >> 32.
+
+	Nothing depends on the order in which chunks are encrypted: encrypt_at()
+	encrypts any slice given its offset in the whole text, and splitting the
+	work between processes gives the same ciphertext as a single pass.
+	"""
+
+	def _seed(self, seed: int) -> None:
+		self.key = splitmix64(seed & MASK64)
+		self.position = 0
+
+	def encrypt_at(self, chunk: str, start: int) -> str:
+		"""Encrypt the slice text[start:start + len(chunk)] of a longer text."""
+		self.position = start
+		return self.encrypt(chunk)
+
+	def encrypt(self, chunk: str) -> str:
+		out = super().encrypt(chunk)
+		self.position += len(chunk)
+		return out
+
+	def _python_words(self, positions: List[int]) -> Sequence[int]:
+		base = self.key + (self.position + 1) * SPLITMIX_GAMMA
+		return [splitmix64((base + i * SPLITMIX_GAMMA) & MASK64) >> 32 for i in positions]
+
+	def _numpy_words(self, positions):
+		np = _numpy()
+		base = np.uint64((self.key + (self.position + 1) * SPLITMIX_GAMMA) & MASK64)
+		states = base + positions.astype(np.uint64) * np.uint64(SPLITMIX_GAMMA)
+		return _splitmix64_np(states) >> np.uint64(32)
+
+
+def decrypt_homophonic(ciphertext: str, homo_map: Dict[str, List[str]]) -> str:
+	"""Invert a homophonic encryption with single-character symbols (letters come out lowercase).
+
+	Only exact when no symbol also appears as an unencrypted character of the
+	text; the default pool of allocate_homophones reuses letters and
+	punctuation, so use a disjoint pool or the token format for round trips.
+	"""
+	table = {}
+	for letter, syms in homo_map.items():
+		for sym in syms:
+			if len(sym) != 1:
+				raise ValueError('decrypt_homophonic needs single-character symbols; use the token format')
+			table[ord(sym)] = letter
+	return ciphertext.translate(table)
+
+
+# Encoder of each pool worker, built once by the initializer
+_worker_encoder: Optional[CounterHomophonicEncoder] = None
+
+
+def _init_encrypt_worker(homo_map: Dict[str, List[str]], seed: int, backend: str) -> None:
+	global _worker_encoder
+	_worker_encoder = CounterHomophonicEncoder(homo_map, seed, backend)
+
+
+def _encrypt_slice(task: Tuple[int, str]) -> str:
+	start, chunk = task
+	return _worker_encoder.encrypt_at(chunk, start)
+
+
+def encrypt_homophonic_parallel(text: str, homo_map: Dict[str, List[str]], seed: int = 42, processes: Optional[int] = None,
+		chunk_chars: int = CHUNK_CHARS, backend: str = 'auto') -> str:
+	"""Counter-based homophonic encryption split across a process pool.
+
+	The result is identical to CounterHomophonicEncoder(homo_map, seed).encrypt(text)
+	for any number of processes and any chunk size.
+	"""
+	tasks = [(start, text[start:start + chunk_chars]) for start in range(0, len(text), chunk_chars)]
+	if processes == 1 or len(tasks) <= 1:
+		encoder = CounterHomophonicEncoder(homo_map, seed, backend)
+		return ''.join(encoder.encrypt_at(chunk, start) for start, chunk in tasks)
+	from multiprocessing import Pool
+	with Pool(processes, initializer=_init_encrypt_worker, initargs=(homo_map, seed, backend)) as pool:
+		return ''.join(pool.imap(_encrypt_slice, tasks))
+
+
+def encrypt_file(src: str, dst: str, key: Union[Dict[str, str], Dict[str, List[str]]], method: str = 'simple',
+		seed: int = 42, chunk_chars: int = CHUNK_CHARS) -> int:
+	"""Encrypt a text file chunk by chunk; returns the number of characters written.
+
+	method is 'simple' (key: letter -> letter) or 'homophonic' (key: letter ->
+	list of symbols).
+	"""
+	chunks = read_chunks(src, chunk_chars)
+	if method == 'simple':
+		out = encrypt_simple_stream(chunks, key)
+	elif method == 'homophonic':
+		out = encrypt_homophonic_stream(chunks, key, seed)
+	else:
+		raise ValueError(f'unknown method {method!r}')
+	written = 0
+	with open(dst, 'w', encoding='utf-8', newline='') as f:
+		for part in out:
+			written += f.write(part)
+	return written
+
+
 def char_freqs_simple(ciphertext: str) -> Counter:
 	return Counter(c.lower() for c in ciphertext if c.isalpha())
 
@@ -182,6 +680,130 @@ def stddev_from_counts(counter: Counter) -> float:
 	return math.sqrt(var)
 
 
+class FrequencyStats:
+	"""Streaming, mergeable symbol counts with the comparison metrics of this exercise.
+
+	Counts live in an array('Q') indexed by symbol, so memory depends on the
+	number of distinct symbols, not on the length of the text. With a fixed
+	symbol list (e.g. the homophone pool, or token IDs) anything else is
+	ignored; without one, new symbols are registered as they appear.
+
+	Args:
+		symbols: Symbols to count (None = open alphabet)
+		fold_case: Lowercase string chunks before counting (as char_freqs_simple)
+		letters_only: In an open alphabet, only register str.isalpha() symbols
+	"""
+
+	def __init__(self, symbols: Optional[Iterable[Hashable]] = None, fold_case: bool = False, letters_only: bool = False):
+		self.closed = symbols is not None
+		self.fold_case = fold_case
+		self.letters_only = letters_only
+		self.symbols: List[Hashable] = []
+		self.index: Dict[Hashable, int] = {}
+		self.counts = array('Q')
+		for sym in symbols or ():
+			self._register(sym)
+
+	@classmethod
+	def for_simple(cls) -> 'FrequencyStats':
+		"""Accumulator equivalent to char_freqs_simple."""
+		return cls(fold_case=True, letters_only=True)
+
+	@classmethod
+	def for_homophonic(cls, pool: Iterable[Hashable]) -> 'FrequencyStats':
+		"""Accumulator equivalent to token_freqs_homophonic (pool of symbols or token IDs)."""
+		return cls(pool)
+
+	def _register(self, sym: Hashable) -> int:
+		i = self.index.get(sym)
+		if i is None:
+			i = self.index[sym] = len(self.symbols)
+			self.symbols.append(sym)
+			self.counts.append(0)
+		return i
+
+	def update(self, chunk: Iterable[Hashable]) -> 'FrequencyStats':
+		"""Count the symbols of a chunk (a string, or a sequence of tokens / token IDs)."""
+		if self.fold_case and isinstance(chunk, str):
+			chunk = chunk.lower()
+		index, counts = self.index, self.counts
+		for sym, n in Counter(chunk).items():
+			i = index.get(sym)
+			if i is None:
+				if self.closed or (self.letters_only and not (isinstance(sym, str) and sym.isalpha())):
+					continue
+				i = self._register(sym)
+			counts[i] += n
+		return self
+
+	def merge(self, other: 'FrequencyStats') -> 'FrequencyStats':
+		"""Add the counts of another accumulator (e.g. from a parallel worker)."""
+		for sym, n in zip(other.symbols, other.counts):
+			if n:
+				i = self.index.get(sym)
+				if i is None:
+					if self.closed:
+						continue
+					i = self._register(sym)
+				self.counts[i] += n
+		return self
+
+	@classmethod
+	def merged(cls, parts: Iterable['FrequencyStats']) -> 'FrequencyStats':
+		"""Merge parts into the first one (an empty FrequencyStats if there are none)."""
+		parts = iter(parts)
+		total = next(parts, None)
+		if total is None:
+			return cls()
+		for part in parts:
+			total.merge(part)
+		return total
+
+	@property
+	def total(self) -> int:
+		return sum(self.counts)
+
+	def nonzero(self) -> List[int]:
+		return [n for n in self.counts if n]
+
+	def entropy(self) -> float:
+		"""Shannon entropy in bits, as entropy_from_counts."""
+		total = self.total
+		if total == 0:
+			return 0.0
+		return math.log2(total) - sum(n * math.log2(n) for n in self.nonzero()) / total
+
+	def stddev(self) -> float:
+		"""Standard deviation of the counts of the symbols seen, as stddev_from_counts."""
+		vals = self.nonzero()
+		if not vals:
+			return 0.0
+		mean = sum(vals) / len(vals)
+		return math.sqrt(sum((x - mean) ** 2 for x in vals) / len(vals))
+
+	def index_of_coincidence(self) -> float:
+		total = self.total
+		if total < 2:
+			return 0.0
+		return sum(n * (n - 1) for n in self.counts) / (total * (total - 1))
+
+	def most_common(self, k: Optional[int] = None) -> List[Tuple[Any, int]]:
+		"""The k most frequent symbols (all if k is None), ties in first-seen order."""
+		seen = [(n, -i) for i, n in enumerate(self.counts) if n]
+		top = sorted(seen, reverse=True) if k is None else heapq.nlargest(k, seen)
+		return [(self.symbols[-i], n) for n, i in top]
+
+	def as_counter(self) -> Counter:
+		return Counter({sym: n for sym, n in zip(self.symbols, self.counts) if n})
+
+
+def stats_from_chunks(chunks: Iterable[Iterable[Hashable]], stats: FrequencyStats) -> FrequencyStats:
+	"""Feed every chunk (e.g. read_chunks() or an encryption stream) to stats."""
+	for chunk in chunks:
+		stats.update(chunk)
+	return stats
+
+
 def print_frequencies(counter: Counter, title: str) -> None:
     print(f'\n{title}:')
     total = sum(counter.values())
@@ -5,9 +5,12 @@ Análisis de frecuencias y generación de hipótesis para descifrar textos.
 """
 from __future__ import annotations
 
+import argparse
+import heapq
 import re
-from collections import Counter
-from typing import Dict, List, Tuple
+from bisect import insort
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 
 # Textos cifrados a analizar
 CIFRADO_SIMPLE = """IH GXIQBY DYZHKSK EYQ RVIOMK DYSOI HKD PYQBKÑKD C IH IEY UI HYD ZÁJKOYD OIDYQKSK IQ IH GKHHI HKD QVSID YEVHBKSKQ IH DYH PXIQBOKD VQ OÍY DIOZIQBIKSK IQBOI HYD ÁOSYHID GIOUID HK TIQBI UIH ZVISHY PXOKSK KH EXIHY EYQ IDZIOKQMK UI NVI HK HHVGXK BOKJIOK SVIQKD EYDIEWKD"""
@@ -37,6 +40,103 @@ def limpiar_texto(texto: str) -> str:
     """Limpia el texto manteniendo solo letras y espacios."""
     return re.sub(r'[^a-záéíóúñü\s]', '', texto.lower())
 
+def patron_palabra(palabra: str) -> str:
+    """Patrón de letras repetidas de una palabra: 'casa' -> 'ABCB'."""
+    vistos: Dict[str, str] = {}
+    return ''.join(vistos.setdefault(c, chr(ord('A') + len(vistos))) for c in palabra)
+
+class IndicePalabras:
+    """Diccionario indexado por longitud, patrón y vecinos a una letra de distancia.
+
+    Conserva el orden (y las repeticiones) de la lista de origen, de modo que los
+    candidatos salen en el mismo orden que recorriendo la lista entera.
+    """
+
+    def __init__(self, palabras: Iterable[str]):
+        self.palabras: List[str] = []
+        self.patrones: List[str] = []
+        self.conjunto = set()
+        self.por_longitud: Dict[int, List[str]] = defaultdict(list)
+        self.por_patron: Dict[str, List[str]] = defaultdict(list)
+        # 'c?sa' -> posiciones de las palabras que solo difieren de 'c?sa' en el '?'
+        self.comodines: Dict[str, List[int]] = defaultdict(list)
+        for palabra in palabras:
+            self.agregar(palabra)
+
+    @classmethod
+    def desde_fichero(cls, ruta: str) -> IndicePalabras:
+        """Carga una lista de palabras (una por línea) de un fichero UTF-8."""
+        with open(ruta, encoding='utf-8') as f:
+            return cls(p for p in (limpiar_texto(linea).strip() for linea in f) if p and ' ' not in p)
+
+    def agregar(self, palabra: str) -> None:
+        posicion = len(self.palabras)
+        patron = patron_palabra(palabra)
+        self.palabras.append(palabra)
+        self.patrones.append(patron)
+        self.conjunto.add(palabra)
+        self.por_longitud[len(palabra)].append(palabra)
+        self.por_patron[patron].append(palabra)
+        for i in range(len(palabra)):
+            self.comodines[palabra[:i] + '?' + palabra[i + 1:]].append(posicion)
+
+    def __contains__(self, palabra: str) -> bool:
+        return palabra in self.conjunto
+
+    def __len__(self) -> int:
+        return len(self.palabras)
+
+    def candidatos_longitud(self, longitud: int) -> List[str]:
+        return self.por_longitud.get(longitud, [])
+
+    def candidatos_patron(self, palabra: str) -> List[str]:
+        """Palabras del diccionario con el mismo patrón de letras repetidas."""
+        return self.por_patron.get(patron_palabra(palabra), [])
+
+    def vecinos(self, palabra: str, patron: Optional[str] = None) -> List[Tuple[int, str]]:
+        """Palabras que difieren en exactamente una letra: (posición de la diferencia, palabra).
+
+        Con patron, solo las que tienen ese patrón de letras repetidas (el de la
+        palabra cifrada, que una sustitución conserva).
+        """
+        encontrados = []
+        for i in range(len(palabra)):
+            for posicion in self.comodines.get(palabra[:i] + '?' + palabra[i + 1:], ()):
+                candidata = self.palabras[posicion]
+                if candidata != palabra and (patron is None or self.patrones[posicion] == patron):
+                    encontrados.append((posicion, i))
+        encontrados.sort()
+        return [(i, self.palabras[posicion]) for posicion, i in encontrados]
+
+INDICE_COMUNES = IndicePalabras(PALABRAS_COMUNES)
+
+class MapeoInverso:
+    """Mapeo cifrado -> claro con su inverso (claro -> orígenes) sincronizado.
+
+    Los orígenes de cada letra se guardan en el orden de inserción del mapeo,
+    como los encontraría una búsqueda lineal en mapeo.items().
+    """
+
+    def __init__(self, mapeo: Dict[str, str]):
+        self.mapeo = dict(mapeo)
+        self.orden = {orig: i for i, orig in enumerate(self.mapeo)}
+        self.inverso: Dict[str, List[str]] = defaultdict(list)
+        for orig, dest in self.mapeo.items():
+            self.inverso[dest].append(orig)
+
+    def origen(self, dest: str) -> Optional[str]:
+        origenes = self.inverso.get(dest)
+        return origenes[0] if origenes else None
+
+    def asignar(self, orig: str, dest: str) -> None:
+        anterior = self.mapeo.get(orig)
+        if anterior is not None:
+            self.inverso[anterior].remove(orig)
+        else:
+            self.orden[orig] = len(self.orden)
+        self.mapeo[orig] = dest
+        insort(self.inverso[dest], orig, key=self.orden.__getitem__)
+
 def obtener_frecuencias(texto: str) -> Dict[str, float]:
     """Calcula las frecuencias de caracteres en el texto."""
     texto_limpio = limpiar_texto(texto)
@@ -52,11 +152,19 @@ def obtener_frecuencias(texto: str) -> Dict[str, float]:
     
     return dict(sorted(frecuencias.items(), key=lambda x: x[1], reverse=True))
 
-def analizar_patron_sustitucion_simple(texto: str) -> Dict[str, str]:
+def frecuencias_idioma(idioma: Optional[str] = None) -> Dict[str, float]:
+    """Frecuencias esperadas por letra: FRECUENCIAS_ESPAÑOL o el modelo de n-gramas del idioma."""
+    if idioma is None:
+        return FRECUENCIAS_ESPAÑOL
+    from modelo_ngramas import cargar_modelo
+    return {letra: p * 100 for letra, p in cargar_modelo(idioma).unigramas().items()}
+
+def analizar_patron_sustitucion_simple(texto: str, idioma: Optional[str] = None) -> Dict[str, str]:
     """Analiza el patrón de sustitución simple basado en frecuencias."""
     frecuencias = obtener_frecuencias(texto)
     chars_ordenados = list(frecuencias.keys())
-    chars_español = sorted(FRECUENCIAS_ESPAÑOL.keys(), key=lambda x: FRECUENCIAS_ESPAÑOL[x], reverse=True)
+    esperadas = frecuencias_idioma(idioma)
+    chars_español = sorted(esperadas.keys(), key=lambda x: esperadas[x], reverse=True)
     
     mapeo = {}
     for i, char_cifrado in enumerate(chars_ordenados):
@@ -65,77 +173,230 @@ def analizar_patron_sustitucion_simple(texto: str) -> Dict[str, str]:
     
     return mapeo
 
+class MapeoCompilado(NamedTuple):
+    """Mapeo preparado para aplicarse en tiempo lineal."""
+    tabla_bytes: Optional[bytes]  # 256 bytes para bytes.translate (None si no cabe en Latin-1)
+    tabla_str: Dict[int, str]     # tabla de str.translate, para cualquier texto
+    minusculas: bool
+
+def compilar_mapeo(mapeo: Dict[str, str], minusculas: bool = True) -> MapeoCompilado:
+    """Compila un mapeo de sustitución una sola vez.
+
+    Si las claves y los valores son caracteres Latin-1, se construye también
+    una tabla de 256 bytes que incluye el paso a minúsculas, de modo que
+    aplicar el mapeo se reduce a encode + bytes.translate + decode.
+    """
+    tabla_str = str.maketrans(mapeo)
+    tabla_bytes = None
+    if all(len(c) == 1 and ord(c) < 256 for par in mapeo.items() for c in par):
+        caracteres = [chr(b).lower() if minusculas else chr(b) for b in range(256)]
+        tabla_bytes = ''.join(mapeo.get(c, c) for c in caracteres).encode('latin-1')
+    return MapeoCompilado(tabla_bytes, tabla_str, minusculas)
+
+def aplicar_mapeo_compilado(texto: str, compilado: MapeoCompilado) -> str:
+    """Aplica un mapeo compilado; los chars no mapeados se mantienen."""
+    if compilado.tabla_bytes is not None:
+        try:
+            return texto.encode('latin-1').translate(compilado.tabla_bytes).decode('latin-1')
+        except UnicodeEncodeError:
+            pass  # El texto tiene caracteres fuera de Latin-1
+    return (texto.lower() if compilado.minusculas else texto).translate(compilado.tabla_str)
+
 def aplicar_mapeo(texto: str, mapeo: Dict[str, str]) -> str:
     """Aplica un mapeo de sustitución al texto."""
-    resultado = ""
-    for char in texto.lower():
-        if char in mapeo:
-            resultado += mapeo[char]
-        elif char.isalpha():
-            resultado += char  # Mantener chars no mapeados
+    return aplicar_mapeo_compilado(texto, compilar_mapeo(mapeo))
+
+def aplicar_mapeo_lote(textos: Iterable[str], mapeo: Dict[str, str], minusculas: bool = True) -> Iterator[str]:
+    """Descifra muchos textos con la misma clave, compilando el mapeo una sola vez."""
+    compilado = compilar_mapeo(mapeo, minusculas)
+    for texto in textos:
+        yield aplicar_mapeo_compilado(texto, compilado)
+
+# Letras que conserva limpiar_texto; cada n-grama se empaqueta en base len(LETRAS_NGRAMAS)
+LETRAS_NGRAMAS = 'abcdefghijklmnopqrstuvwxyzáéíóúñü'
+INDICE_NGRAMAS = {c: i for i, c in enumerate(LETRAS_NGRAMAS)}
+# limpiar_texto(...).replace(' ', '') conserva los saltos de línea, tabuladores y demás
+# espacios Unicode: en el modo original forman parte de los n-gramas
+SIMBOLOS_ORIGINAL = LETRAS_NGRAMAS + ''.join(c for c in map(chr, range(0x3001)) if c.isspace() and c != ' ')
+INDICE_ORIGINAL = {c: i for i, c in enumerate(SIMBOLOS_ORIGINAL)}
+# Por debajo de este número de n-gramas posibles se cuenta en una lista densa
+MAXIMO_DENSO = 1 << 16
+TAMANO_TROZO = 1 << 20
+
+class ContadorNgramas:
+    """Cuenta n-gramas de cualquier orden empaquetados como enteros.
+
+    La ventana avanza letra a letra (codigo = codigo * base + letra mod base**n),
+    sin crear cadenas. El estado de la ventana se conserva entre llamadas a
+    actualizar(), de modo que un texto puede darse por trozos sin perder los
+    n-gramas que cruzan el corte.
+
+    Con respetar_palabras solo cuentan las letras y cualquier otro carácter
+    (espacio, puntuación, dígito) corta la ventana, así que no hay n-gramas
+    entre palabras. Si no, se cuenta como el análisis original sobre
+    limpiar_texto(texto).replace(' ', ''): se saltan los espacios ' ' y los
+    caracteres que no son letras, pero los saltos de línea y demás espacios
+    forman parte de los n-gramas.
+    """
+
+    def __init__(self, n: int, respetar_palabras: bool = False, denso: Optional[bool] = None):
+        self.n = n
+        self.respetar_palabras = respetar_palabras
+        self.simbolos, self.indice = (LETRAS_NGRAMAS, INDICE_NGRAMAS) if respetar_palabras \
+            else (SIMBOLOS_ORIGINAL, INDICE_ORIGINAL)
+        self.base = len(self.simbolos)
+        self.modulo = self.base ** n
+        self.denso = self.modulo <= MAXIMO_DENSO if denso is None else denso
+        self.conteos = [0] * self.modulo if self.denso else Counter()
+        self._codigo = 0
+        self._largo = 0
+
+    def actualizar(self, trozo: str) -> None:
+        """Suma los n-gramas de un trozo de texto (continúa la ventana del anterior)."""
+        conteos, indice, base, modulo, n = self.conteos, self.indice, self.base, self.modulo, self.n
+        codigo, largo = self._codigo, self._largo
+        for c in trozo.lower():
+            letra = indice.get(c)
+            if letra is None:
+                if self.respetar_palabras:
+                    codigo = largo = 0
+                continue
+            codigo = (codigo * base + letra) % modulo
+            largo += 1
+            if largo >= n:
+                conteos[codigo] += 1
+        self._codigo, self._largo = codigo, largo
+
+    def fusionar(self, otro: ContadorNgramas) -> None:
+        """Suma los conteos de otro contador del mismo orden y modo.
+
+        Con otro orden o con otro respetar_palabras los códigos no significan
+        lo mismo, así que se lanza ValueError.
+        """
+        if (otro.n, otro.respetar_palabras) != (self.n, self.respetar_palabras):
+            raise ValueError(f"No se puede fusionar un contador (n={otro.n}, respetar_palabras="
+                             f"{otro.respetar_palabras}) con otro (n={self.n}, "
+                             f"respetar_palabras={self.respetar_palabras})")
+        if self.denso and otro.denso:
+            self.conteos = [a + b for a, b in zip(self.conteos, otro.conteos)]
         else:
-            resultado += char  # Mantener espacios y puntuación
-    return resultado
+            for codigo, cuenta in otro.items():
+                self.conteos[codigo] += cuenta
 
-def analizar_bigramas_trigramas(texto: str) -> Tuple[Dict[str, int], Dict[str, int]]:
-    """Analiza bigramas y trigramas en el texto."""
-    texto_limpio = limpiar_texto(texto).replace(' ', '')
-    
-    bigramas = {}
-    trigramas = {}
-    
-    for i in range(len(texto_limpio) - 1):
-        bigrama = texto_limpio[i:i+2]
-        bigramas[bigrama] = bigramas.get(bigrama, 0) + 1
-    
-    for i in range(len(texto_limpio) - 2):
-        trigrama = texto_limpio[i:i+3]
-        trigramas[trigrama] = trigramas.get(trigrama, 0) + 1
-    
-    return (dict(sorted(bigramas.items(), key=lambda x: x[1], reverse=True)[:10]),
-            dict(sorted(trigramas.items(), key=lambda x: x[1], reverse=True)[:10]))
+    def items(self) -> Iterator[Tuple[int, int]]:
+        """(código, cuenta) de los n-gramas vistos."""
+        if self.denso:
+            return ((codigo, cuenta) for codigo, cuenta in enumerate(self.conteos) if cuenta)
+        return iter(self.conteos.items())
+
+    def decodificar(self, codigo: int) -> str:
+        letras = []
+        for _ in range(self.n):
+            codigo, letra = divmod(codigo, self.base)
+            letras.append(self.simbolos[letra])
+        return ''.join(reversed(letras))
+
+    def mas_frecuentes(self, k: int = 10) -> Dict[str, int]:
+        """Los k n-gramas más frecuentes, con un montículo en lugar de ordenar todo.
+
+        Los empates conservan el orden de aparición (o el de código, en modo denso).
+        """
+        mejores = heapq.nlargest(k, self.items(), key=lambda x: x[1])
+        return {self.decodificar(codigo): cuenta for codigo, cuenta in mejores}
+
+def contar_ngramas(texto: str, n: int, respetar_palabras: bool = False, denso: Optional[bool] = None) -> ContadorNgramas:
+    """Cuenta los n-gramas de un texto en memoria."""
+    contador = ContadorNgramas(n, respetar_palabras, denso)
+    contador.actualizar(texto)
+    return contador
 
-def buscar_patrones_palabras(texto: str) -> List[str]:
-    """Busca patrones de palabras que podrían coincidir con palabras comunes."""
+def contar_ngramas_fichero(ruta: str, ordenes: Iterable[int] = (2, 3), respetar_palabras: bool = False,
+                           tamano_trozo: int = TAMANO_TROZO) -> Dict[int, ContadorNgramas]:
+    """Cuenta n-gramas de varios órdenes leyendo el fichero por trozos (memoria acotada)."""
+    contadores = {n: ContadorNgramas(n, respetar_palabras) for n in ordenes}
+    with open(ruta, encoding='utf-8', errors='replace') as f:
+        while True:
+            trozo = f.read(tamano_trozo)
+            if not trozo:
+                break
+            for contador in contadores.values():
+                contador.actualizar(trozo)
+    return contadores
+
+def analizar_bigramas_trigramas(texto: str, respetar_palabras: bool = False) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """Analiza bigramas y trigramas en el texto.
+
+    Por defecto da los mismos 10 más frecuentes que el análisis original (con
+    los saltos de línea dentro de los n-gramas); con respetar_palabras, solo
+    n-gramas de letras dentro de una misma palabra.
+    """
+    return (contar_ngramas(texto, 2, respetar_palabras, denso=False).mas_frecuentes(10),
+            contar_ngramas(texto, 3, respetar_palabras, denso=False).mas_frecuentes(10))
+
+def buscar_patrones_palabras(texto: str, indice: Optional[IndicePalabras] = None) -> List[str]:
+    """Busca patrones de palabras que podrían coincidir con palabras comunes.
+
+    Una sustitución conserva el patrón de letras repetidas, así que los
+    candidatos de cada palabra son los del índice por patrón ('ABCB'), no
+    todos los de su longitud.
+    """
+    indice = indice or INDICE_COMUNES
     palabras = texto.split()
     patrones_encontrados = []
     
     for palabra in palabras:
         palabra_limpia = limpiar_texto(palabra)
         if len(palabra_limpia) > 0:
-            candidatos = [p for p in PALABRAS_COMUNES if len(p) == len(palabra_limpia)]
+            candidatos = indice.candidatos_patron(palabra_limpia)
             if candidatos:
                 patrones_encontrados.append(f"'{palabra_limpia}' ({len(palabra_limpia)} chars) -> posibles: {candidatos[:3]}")
     
     return patrones_encontrados[:15]
 
-def mejorar_mapeo_con_palabras_comunes(texto: str, mapeo_inicial: Dict[str, str]) -> Dict[str, str]:
-    """Mejora el mapeo basándose en palabras conocidas."""
-    mapeo = mapeo_inicial.copy()
-    texto_descifrado = aplicar_mapeo(texto, mapeo)
+def patron_cifrado(cifradas: List[str], descifradas: List[str], j: int) -> Optional[str]:
+    """Patrón de la palabra cifrada j, limitado a las letras que conserva limpiar_texto.
+
+    None si la palabra no se alinea carácter a carácter con su descifrado.
+    """
+    if len(cifradas) != len(descifradas) or len(cifradas[j]) != len(descifradas[j]):
+        return None
+    conservadas = limpiar_texto(descifradas[j])
+    pares = [c for c, d in zip(cifradas[j], descifradas[j].lower()) if d in INDICE_NGRAMAS]
+    if len(pares) != len(conservadas):
+        return None
+    return patron_palabra(pares)
+
+def mejorar_mapeo_con_palabras_comunes(texto: str, mapeo_inicial: Dict[str, str],
+                                       indice: Optional[IndicePalabras] = None) -> Dict[str, str]:
+    """Mejora el mapeo basándose en palabras conocidas.
+
+    Solo se corrigen palabras hacia palabras comunes con el mismo patrón de
+    letras repetidas que la palabra cifrada.
+    """
+    indice = indice or INDICE_COMUNES
+    mapeo = MapeoInverso(mapeo_inicial)
+    texto_descifrado = aplicar_mapeo(texto, mapeo_inicial)
     palabras = texto_descifrado.split()
+    cifradas = texto.lower().split()
     
     # Buscar palabras que coincidan exactamente con palabras comunes
-    for palabra in palabras:
+    for j, palabra in enumerate(palabras):
         palabra_limpia = limpiar_texto(palabra)
-        if palabra_limpia in PALABRAS_COMUNES:
+        if palabra_limpia in indice:
             continue  
         
-        for palabra_comun in PALABRAS_COMUNES:
-            if len(palabra_limpia) == len(palabra_comun):
-                diferencias = sum(1 for a, b in zip(palabra_limpia, palabra_comun) if a != b)
-                if diferencias == 1: 
-                    for i, (a, b) in enumerate(zip(palabra_limpia, palabra_comun)):
-                        if a != b:
-                            # Encontrar caracter original
-                            for orig, dest in mapeo.items():
-                                if dest == a:
-                                    mapeo[orig] = b
-                                    break
-    
-    return mapeo
+        # Palabras comunes a una sola letra de distancia, por el índice de comodines,
+        # con el patrón de la palabra cifrada
+        for i, palabra_comun in indice.vecinos(palabra_limpia, patron_cifrado(cifradas, palabras, j)):
+            a, b = palabra_limpia[i], palabra_comun[i]
+            # Encontrar caracter original
+            orig = mapeo.origen(a)
+            if orig is not None:
+                mapeo.asignar(orig, b)
+    
+    return mapeo.mapeo
 
-def descifrar_sustitucion_simple(texto: str) -> Tuple[str, Dict[str, str]]:
+def descifrar_sustitucion_simple(texto: str, indice: Optional[IndicePalabras] = None) -> Tuple[str, Dict[str, str]]:
     """Función principal para descifrar sustitución simple."""
     print("=" * 60)
     print("ANÁLISIS DE SUSTITUCIÓN SIMPLE")
@@ -159,13 +420,13 @@ def descifrar_sustitucion_simple(texto: str) -> Tuple[str, Dict[str, str]]:
     print(f"\nTexto parcialmente descifrado:\n{texto_parcial}\n")
     
     # Análisis de patrones de palabras
-    patrones = buscar_patrones_palabras(texto_parcial)
+    patrones = buscar_patrones_palabras(texto_parcial, indice)
     print("Patrones de palabras encontrados:")
     for patron in patrones[:8]:
         print(f"  {patron}")
     
     # Mejorar mapeo
-    mapeo_mejorado = mejorar_mapeo_con_palabras_comunes(texto, mapeo_inicial)
+    mapeo_mejorado = mejorar_mapeo_con_palabras_comunes(texto, mapeo_inicial, indice)
     texto_final = aplicar_mapeo(texto, mapeo_mejorado)
     
     print(f"\nTexto con mapeo mejorado:\n{texto_final}\n")
@@ -178,7 +439,7 @@ def descifrar_sustitucion_simple(texto: str) -> Tuple[str, Dict[str, str]]:
     
     return texto_final, mapeo_mejorado
 
-def analizar_homofonos(texto: str) -> Tuple[str, Dict]:
+def analizar_homofonos(texto: str, indice: Optional[IndicePalabras] = None) -> Tuple[str, Dict]:
     """Análisis específico para cifrado homófono."""
     print("=" * 60)
     print("ANÁLISIS DE CIFRADO HOMÓFONO")
@@ -215,18 +476,13 @@ def analizar_homofonos(texto: str) -> Tuple[str, Dict]:
             mapeo_basico[simbolo] = chars_español_frecuentes[i]
             print(f"  '{simbolo}' -> '{chars_español_frecuentes[i]}'")
     
-    # Aplicar mapeo básico
-    texto_tentativo = ""
-    for char in texto:
-        if char in mapeo_basico:
-            texto_tentativo += mapeo_basico[char]
-        else:
-            texto_tentativo += char
+    # Aplicar mapeo básico (los símbolos distinguen mayúsculas)
+    texto_tentativo = aplicar_mapeo_compilado(texto, compilar_mapeo(mapeo_basico, minusculas=False))
     
     print(f"\nTexto con mapeo tentativo:\n{texto_tentativo}\n")
     
     # Buscar patrones reconocibles
-    patrones = buscar_patrones_palabras(texto_tentativo)
+    patrones = buscar_patrones_palabras(texto_tentativo, indice)
     print("Patrones de palabras en texto tentativo:")
     for patron in patrones[:8]:
         print(f"  {patron}")
@@ -241,14 +497,15 @@ def analizar_homofonos(texto: str) -> Tuple[str, Dict]:
     
     return texto_tentativo, analisis
 
-def generar_hipotesis_contenido(texto_descifrado: str) -> List[str]:
+def generar_hipotesis_contenido(texto_descifrado: str, indice: Optional[IndicePalabras] = None) -> List[str]:
     """Genera hipótesis sobre el contenido del texto."""
+    indice = indice or INDICE_COMUNES
     palabras = texto_descifrado.lower().split()
     palabras_reconocibles = []
     
     for palabra in palabras:
         palabra_limpia = limpiar_texto(palabra)
-        if palabra_limpia in PALABRAS_COMUNES or len(palabra_limpia) > 4:
+        if palabra_limpia in indice or len(palabra_limpia) > 4:
             palabras_reconocibles.append(palabra_limpia)
     
     hipotesis = []
@@ -278,19 +535,24 @@ def generar_hipotesis_contenido(texto_descifrado: str) -> List[str]:
     
     return hipotesis
 
-def main():
+def main(argv: Optional[List[str]] = None):
     """Función principal que ejecuta el análisis completo."""
+    parser = argparse.ArgumentParser(description="Descifrador de sustitución simple y homófona.")
+    parser.add_argument('-d', '--diccionario', help="Lista de palabras (una por línea) en lugar de PALABRAS_COMUNES")
+    args = parser.parse_args(argv)
+    indice = IndicePalabras.desde_fichero(args.diccionario) if args.diccionario else INDICE_COMUNES
+
     print("DESCIFRADOR DE TEXTOS CIFRADOS")
     print("Análisis criptográfico de sustitución simple y homófona")
     print("=" * 60)
     
     # Análisis del cifrado simple
-    texto1_descifrado, mapeo1 = descifrar_sustitucion_simple(CIFRADO_SIMPLE)
+    texto1_descifrado, mapeo1 = descifrar_sustitucion_simple(CIFRADO_SIMPLE, indice)
     
     print("RESULTADO FINAL - SUSTITUCIÓN SIMPLE:")
     print(f"Texto descifrado:\n{texto1_descifrado}\n")
     
-    hipotesis1 = generar_hipotesis_contenido(texto1_descifrado)
+    hipotesis1 = generar_hipotesis_contenido(texto1_descifrado, indice)
     print("Hipótesis del contenido:")
     for h in hipotesis1:
         print(f"  • {h}")
@@ -298,12 +560,12 @@ def main():
     print("\n" + "=" * 60)
     
     # Análisis del cifrado homófono  
-    texto2_tentativo, analisis2 = analizar_homofonos(CIFRADO_HOMOFONOS)
+    texto2_tentativo, analisis2 = analizar_homofonos(CIFRADO_HOMOFONOS, indice)
     
     print("RESULTADO FINAL - CIFRADO HOMÓFONO:")
     print(f"Texto tentativo:\n{texto2_tentativo}\n")
     
-    hipotesis2 = generar_hipotesis_contenido(texto2_tentativo)
+    hipotesis2 = generar_hipotesis_contenido(texto2_tentativo, indice)
     print("Hipótesis del contenido:")
     for h in hipotesis2:
         print(f"  • {h}")
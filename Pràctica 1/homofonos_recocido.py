@@ -0,0 +1,330 @@
+"""
+Resolución de cifrados homófonos por recocido simulado.
+
+La clave asigna a cada símbolo del texto cifrado una letra del alfabeto
+(varios símbolos pueden compartir letra). La búsqueda reasigna un símbolo o
+intercambia las letras de dos símbolos y, con EstadoRecocido, solo vuelve a
+puntuar los cuadrigramas que contienen los símbolos tocados. Cada reinicio
+tiene un número fijo de iteraciones; los reinicios se reparten entre procesos
+por rondas y la búsqueda acaba cuando dos reinicios coinciden en la mejor
+puntuación (o al llegar a MAX_REINICIOS), así que con la misma semilla el
+resultado es el mismo.
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import os
+import random
+import time
+from collections import Counter
+from multiprocessing import Pool
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ex2_Desxifrar import CIFRADO_HOMOFONOS, FRECUENCIAS_ESPAÑOL
+from modelo_ngramas import cargar_modelo
+from sustitucion_recocido import ALFABETO, INDICE, TAM, EstadoRecocido, tabla_idioma
+
+ITERACIONES_POR_SIMBOLO = 1000
+TEMPERATURA_INICIAL = 6.0
+PROBABILIDAD_INTERCAMBIO = 0.2
+# Peso del término de distribución de letras frente a los cuadrigramas
+PESO_UNIGRAMAS = 8.0
+# Tope de reinicios si ninguna pareja coincide
+MAX_REINICIOS = 24
+# Dos puntuaciones (log10) iguales salvo redondeo son la misma solución
+TOLERANCIA_ACUERDO = 1e-6
+
+
+def codificar_homofonos(texto: str, simbolos: Optional[Sequence[str]] = None) -> Tuple[List[int], List[str]]:
+    """Codifica el texto cifrado como índices de símbolo.
+
+    Args:
+        texto: Texto cifrado
+        simbolos: Símbolos del cifrado (por defecto, todo carácter que no sea espacio)
+
+    Returns:
+        (códigos de los símbolos en orden de aparición, lista de símbolos)
+    """
+    if simbolos is None:
+        conjunto = {c for c in texto if not c.isspace()}
+    else:
+        conjunto = set(simbolos)
+    lista = sorted(c for c in conjunto if c in texto)
+    indice = {s: i for i, s in enumerate(lista)}
+    return [indice[c] for c in texto if c in indice], lista
+
+
+class EstadoHomofonos(EstadoRecocido):
+    """EstadoRecocido más un término que penaliza la distribución de letras.
+
+    Con solo cuadrigramas, asignar muchos símbolos a pocas letras frecuentes
+    ('e', 's', 'd'...) es un óptimo local muy profundo. Se resta
+    peso * sum(c_l * log10(c_l / (N * p_l))), que solo depende del número de
+    apariciones c_l de cada letra y se actualiza en O(1) por movimiento.
+    """
+
+    def __init__(self, codigos: Sequence[int], tabla: Sequence[float], n_simbolos: int,
+                 probabilidades: Sequence[float], peso: float = PESO_UNIGRAMAS):
+        super().__init__(codigos, tabla, n_simbolos)
+        cuentas = Counter(c for c in codigos if c < n_simbolos)
+        self.apariciones = [cuentas[s] for s in range(n_simbolos)]
+        total = sum(self.apariciones)
+        self.esperadas = [p * total for p in probabilidades]
+        self.peso = peso
+        self.por_letra = [0] * TAM
+
+    def _termino(self, letra: int, cuenta: int) -> float:
+        return cuenta * math.log10(cuenta / self.esperadas[letra]) if cuenta > 0 else 0.0
+
+    def _delta_letras(self, ajustes: List[Tuple[int, int]]) -> float:
+        """Cambio del término de distribución al sumar cada (letra, incremento)."""
+        agrupados: Dict[int, int] = {}
+        for letra, incremento in ajustes:
+            agrupados[letra] = agrupados.get(letra, 0) + incremento
+        delta = 0.0
+        for letra, incremento in agrupados.items():
+            cuenta = self.por_letra[letra]
+            delta += self._termino(letra, cuenta + incremento) - self._termino(letra, cuenta)
+        return -self.peso * delta
+
+    def puntuar(self, clave: List[int]) -> float:
+        cuadrigramas = super().puntuar(clave)
+        self.por_letra = [0] * TAM
+        for s, letra in enumerate(clave):
+            self.por_letra[letra] += self.apariciones[s]
+        return cuadrigramas - self.peso * sum(self._termino(l, c) for l, c in enumerate(self.por_letra))
+
+    def reasignar(self, clave, s, letra):
+        anterior = clave[s]
+        delta, nuevas = super().reasignar(clave, s, letra)
+        ajustes = [(anterior, -self.apariciones[s]), (letra, self.apariciones[s])]
+        return delta + self._delta_letras(ajustes), (nuevas, ajustes)
+
+    def intercambio(self, clave, a, b):
+        letra_a, letra_b = clave[a], clave[b]
+        delta, nuevas = super().intercambio(clave, a, b)
+        diferencia = self.apariciones[b] - self.apariciones[a]
+        ajustes = [(letra_a, diferencia), (letra_b, -diferencia)]
+        return delta + self._delta_letras(ajustes), (nuevas, ajustes)
+
+    def aceptar(self, cambios) -> None:
+        nuevas, ajustes = cambios
+        super().aceptar(nuevas)
+        for letra, incremento in ajustes:
+            self.por_letra[letra] += incremento
+
+
+def clave_por_frecuencias(codigos: Sequence[int], n_simbolos: int) -> List[int]:
+    """Clave inicial: cada símbolo, de más a menos frecuente, va a la letra con más déficit.
+
+    El déficit de una letra es su número esperado de apariciones menos las que
+    ya tiene asignadas.
+    """
+    cuentas = Counter(codigos)
+    total = sum(FRECUENCIAS_ESPAÑOL.get(c, 0) for c in ALFABETO)
+    deficit = [FRECUENCIAS_ESPAÑOL.get(c, 0) / total * len(codigos) for c in ALFABETO]
+    clave = [0] * n_simbolos
+    for s in sorted(range(n_simbolos), key=lambda s: -cuentas[s]):
+        letra = max(range(TAM), key=deficit.__getitem__)
+        clave[s] = letra
+        deficit[letra] -= cuentas[s]
+    return clave
+
+
+def recocer_homofonos(estado: EstadoHomofonos, clave: List[int], rand: random.Random,
+                      iteraciones: int, t0: float = TEMPERATURA_INICIAL) -> Tuple[float, List[int]]:
+    """Un reinicio de recocido: reasignaciones de un símbolo e intercambios entre dos."""
+    n = len(clave)
+    actual = estado.puntuar(clave)
+    mejor, mejor_clave = actual, clave[:]
+    for it in range(iteraciones):
+        temperatura = t0 * (1 - it / iteraciones) + 1e-9
+        if n > 1 and rand.random() < PROBABILIDAD_INTERCAMBIO:
+            a, b = rand.sample(range(n), 2)
+            if clave[a] == clave[b]:
+                continue
+            deshacer = (a, clave[a], b, clave[b])
+            delta, nuevas = estado.intercambio(clave, a, b)
+        else:
+            s = rand.randrange(n)
+            anterior = clave[s]
+            letra = rand.randrange(TAM - 1)
+            letra += letra >= anterior
+            delta, nuevas = estado.reasignar(clave, s, letra)
+            deshacer = (s, anterior, s, anterior)
+        if delta >= 0 or rand.random() < math.exp(delta / temperatura):
+            estado.aceptar(nuevas)
+            actual += delta
+            if actual > mejor:
+                mejor, mejor_clave = actual, clave[:]
+        else:
+            a, letra_a, b, letra_b = deshacer
+            clave[b], clave[a] = letra_b, letra_a
+    return mejor, mejor_clave
+
+
+# Estado de cada proceso del pool
+_codigos: List[int] = []
+_n_simbolos = 0
+_estado: Optional[EstadoHomofonos] = None
+
+
+def _iniciar_trabajador(codigos: List[int], n_simbolos: int, idioma: str) -> None:
+    global _codigos, _n_simbolos, _estado
+    _codigos, _n_simbolos = codigos, n_simbolos
+    probabilidades = cargar_modelo(idioma).unigramas(ALFABETO)
+    _estado = EstadoHomofonos(codigos, tabla_idioma(idioma), n_simbolos, [probabilidades[c] for c in ALFABETO])
+
+
+def _preparado(_: int) -> bool:
+    return _estado is not None
+
+
+def _reinicio(tarea: Tuple[int, int]) -> Tuple[float, List[int]]:
+    """Un reinicio completo; su generador depende solo de (semilla, número de reinicio).
+
+    El reinicio 0 parte de la clave por frecuencias; el resto, de claves al azar.
+    Cada reinicio acaba en la solución o en un óptimo local lejano, así que
+    conviene empezar de cero y no perturbar el mejor.
+    """
+    semilla, numero = tarea
+    rand = random.Random(f'{semilla}:{numero}')
+    if numero == 0:
+        clave = clave_por_frecuencias(_codigos, _n_simbolos)
+    else:
+        clave = [rand.randrange(TAM) for _ in range(_n_simbolos)]
+    return recocer_homofonos(_estado, clave, rand, ITERACIONES_POR_SIMBOLO * _n_simbolos)
+
+
+def _acuerdo(resultados: List[Tuple[float, List[int]]]) -> Optional[int]:
+    """Primer reinicio k en que la mejor puntuación de los reinicios 0..k ya ha salido dos veces."""
+    mejor, veces = -math.inf, 0
+    for k, (puntuacion, _) in enumerate(resultados):
+        if puntuacion > mejor + TOLERANCIA_ACUERDO:
+            mejor, veces = puntuacion, 1
+        elif puntuacion >= mejor - TOLERANCIA_ACUERDO:
+            veces += 1
+            if veces == 2:
+                return k
+    return None
+
+
+def resolver_homofonos(texto: str, simbolos: Optional[Sequence[str]] = None, tiempo: Optional[float] = None,
+                       procesos: Optional[int] = None, semilla: int = 0, idioma: str = 'es',
+                       max_reinicios: int = MAX_REINICIOS) -> Tuple[float, Dict[str, str]]:
+    """Busca la clave de un cifrado homófono con reinicios en paralelo.
+
+    Los reinicios se lanzan por rondas de `procesos` y se examinan en orden:
+    la búsqueda acaba en el primer reinicio con el que la mejor puntuación ha
+    salido dos veces, o tras max_reinicios. Los reinicios de más de la última
+    ronda se descartan, de modo que el resultado no depende de procesos.
+
+    Args:
+        texto: Texto cifrado
+        simbolos: Símbolos del cifrado (por defecto, todo carácter que no sea espacio)
+        tiempo: Límite opcional en segundos, contado con el pool ya iniciado y
+            comprobado solo entre rondas (con él, el número de reinicios
+            puede depender de la máquina)
+        procesos: Procesos del pool (1 = sin pool; None = todos los núcleos)
+        semilla: Semilla base de los reinicios
+        idioma: Código del modelo de n-gramas
+        max_reinicios: Tope de reinicios
+
+    Returns:
+        (puntuación, mapeo símbolo -> letra) de la mejor clave
+    """
+    tabla_idioma(idioma)  # comprueba el modelo antes de lanzar el pool
+    codigos, lista = codificar_homofonos(texto, simbolos)
+    procesos = procesos or os.cpu_count() or 1
+    resultados: List[Tuple[float, List[int]]] = []
+    pool = None
+    if procesos == 1:
+        _iniciar_trabajador(codigos, len(lista), idioma)
+        ejecutar = lambda tareas: [_reinicio(t) for t in tareas]
+    else:
+        pool = Pool(procesos, initializer=_iniciar_trabajador, initargs=(codigos, len(lista), idioma))
+        pool.map(_preparado, range(procesos), chunksize=1)
+        ejecutar = lambda tareas: pool.map(_reinicio, tareas, chunksize=1)
+    try:
+        inicio = time.perf_counter()
+        ultimo = None
+        while ultimo is None and len(resultados) < max_reinicios:
+            if tiempo is not None and resultados and time.perf_counter() - inicio > tiempo:
+                break
+            ronda = range(len(resultados), min(len(resultados) + procesos, max_reinicios))
+            resultados += ejecutar([(semilla, k) for k in ronda])
+            ultimo = _acuerdo(resultados)
+    finally:
+        if pool is not None:
+            pool.terminate()
+    if ultimo is not None:
+        resultados = resultados[:ultimo + 1]
+    puntuacion, clave = max(resultados, key=lambda r: r[0])
+    return puntuacion, {s: ALFABETO[clave[i]] for i, s in enumerate(lista)}
+
+
+def cifrado_de_prueba(claro: Optional[str] = None, seed: int = 42) -> Tuple[str, List[str], str]:
+    """Cifra un texto de prueba con allocate_homophones/encrypt_homophonic como en ex2.main().
+
+    El acierto solo dice algo si el texto no forma parte del corpus del
+    modelo. Por defecto se usa ex2.PLAINTEXT, que ningún modelo incluye salvo
+    que se haya metido a mano en el corpus.
+
+    Returns:
+        (texto cifrado, símbolos del cifrado, texto en claro)
+    """
+    from ex2 import PLAINTEXT, allocate_homophones, encrypt_homophonic, get_letters
+    claro = PLAINTEXT if claro is None else claro
+    letras = get_letters(claro)
+    cuentas = Counter(c.lower() for c in claro if c.isalpha())
+    asignacion = allocate_homophones(letras, cuentas, max(200, len(letras) * 6), seed=seed)
+    simbolos = [s for lista in asignacion.values() for s in lista]
+    return encrypt_homophonic(claro, asignacion, seed=seed), simbolos, claro
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recocido simulado para cifrados homófonos.")
+    parser.add_argument('fichero', nargs='?', help="Texto cifrado (por defecto, CIFRADO_HOMOFONOS)")
+    parser.add_argument('-p', '--prueba', nargs='?', const='', metavar='CLARO',
+                        help="Cifrar un texto que no esté en el corpus del modelo (por defecto, ex2.PLAINTEXT) "
+                             "como en ex2.py y medir el acierto")
+    parser.add_argument('-t', '--tiempo', type=float, default=None, help="Límite de segundos entre rondas (por defecto, ninguno)")
+    parser.add_argument('-r', '--reinicios', type=int, default=MAX_REINICIOS, help="Tope de reinicios")
+    parser.add_argument('-j', '--procesos', type=int, default=None, help="Procesos (por defecto, todos los núcleos)")
+    parser.add_argument('-s', '--semilla', type=int, default=0, help="Semilla base")
+    parser.add_argument('-i', '--idioma', default='es', help="Modelo de n-gramas del almacén")
+    parser.add_argument('-c', '--corpus', nargs='+', help="Ficheros con que construir el modelo si aún no existe")
+    args = parser.parse_args()
+
+    simbolos, claro = None, None
+    texto = CIFRADO_HOMOFONOS
+    if args.prueba is not None:
+        if args.prueba:
+            with open(args.prueba, encoding='utf-8') as f:
+                claro = f.read()
+        texto, simbolos, claro = cifrado_de_prueba(claro)
+    elif args.fichero:
+        with open(args.fichero, encoding='utf-8') as f:
+            texto = f.read()
+
+    try:
+        cargar_modelo(args.idioma, args.corpus)
+    except FileNotFoundError as error:
+        parser.error(str(error))
+    inicio = time.perf_counter()
+    puntuacion, mapeo = resolver_homofonos(texto, simbolos, args.tiempo, args.procesos, args.semilla, args.idioma,
+                                           args.reinicios)
+    descifrado = texto.translate(str.maketrans(mapeo))
+    print(f"Símbolos: {len(mapeo)}  puntuación (log10): {puntuacion:.2f}  tiempo: {time.perf_counter() - inicio:.1f}s")
+    print(f"\nTexto descifrado:\n{descifrado}")
+    if claro is not None:
+        # El cifrado es carácter a carácter: se compara posición a posición
+        plegado = str.maketrans('áéíóúü', 'aeiouu')
+        pares = [(p, mapeo.get(c)) for p, c in zip(claro.lower().translate(plegado), texto) if p in INDICE]
+        aciertos = sum(p == c for p, c in pares)
+        print(f"\nAcierto: {aciertos}/{len(pares)} letras ({aciertos / len(pares):.1%})")
+
+
+if __name__ == '__main__':
+    main()
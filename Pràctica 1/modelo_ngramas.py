@@ -0,0 +1,205 @@
+"""
+Almacén de modelos de n-gramas precompilados.
+
+Entrena tablas de log10-probabilidades de unigramas a cuadrigramas a partir
+de un corpus y las guarda en un fichero binario compacto (float32, una tabla
+densa por orden). Los modelos se cargan con mmap: los procesos que usan el
+mismo idioma comparten las mismas páginas y cargar un modelo no copia nada.
+
+El repositorio no trae corpus ni modelos: antes de usar los resolvedores hay
+que construir el modelo con textos largos del idioma, por ejemplo
+
+    python modelo_ngramas.py es quijote.txt
+
+Formato: cabecera '<4sBBBxI' (MAGIA, versión, orden, orden de bytes, bytes
+del alfabeto), el alfabeto en UTF-8 alineado a 4 bytes y, para n = 1..orden,
+una tabla de len(alfabeto)**n valores float32.
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import warnings
+from array import array
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+
+MAGIA = b'NGRM'
+VERSION = 1
+CABECERA = struct.Struct('<4sBBBxI')
+ORDEN_MAXIMO = 4
+
+DIRECTORIO_MODELOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'modelos')
+
+ALFABETO_ES = 'abcdefghijklmnopqrstuvwxyzñ'
+ACENTUADAS = 'áéíóúüàèìòùï'
+BASE_ACENTUADAS = 'aeiouuaeioui'
+# Por debajo de estas letras de corpus las tablas de cuadrigramas son demasiado dispersas
+LETRAS_MINIMAS_CORPUS = 200_000
+
+
+def ruta_modelo(idioma: str) -> str:
+    """Ruta del fichero de modelo de un idioma."""
+    return os.path.join(DIRECTORIO_MODELOS, f'{idioma}.ngr')
+
+
+def leer_corpus(rutas: Sequence[str]) -> str:
+    """Texto de los ficheros de un corpus (UTF-8), unidos por saltos de línea."""
+    partes = []
+    for ruta in rutas:
+        with open(ruta, encoding='utf-8') as f:
+            partes.append(f.read())
+    return '\n'.join(partes)
+
+
+def entrenar(corpus: str, alfabeto: str = ALFABETO_ES, orden: int = ORDEN_MAXIMO) -> List[array]:
+    """Cuenta n-gramas (n = 1..orden) del corpus y devuelve sus tablas de log10-probabilidad.
+
+    Las vocales acentuadas se pliegan a la vocal base y el resto de caracteres
+    fuera del alfabeto se descarta. Los n-gramas no vistos reciben
+    log10(0.01 / total) del orden correspondiente.
+    """
+    tam = len(alfabeto)
+    indice = {c: i for i, c in enumerate(alfabeto)}
+    texto = corpus.lower().translate(str.maketrans(ACENTUADAS, BASE_ACENTUADAS))
+    letras = [indice[c] for c in texto if c in indice]
+    if len(letras) < LETRAS_MINIMAS_CORPUS:
+        warnings.warn(f"corpus de {len(letras)} letras (< {LETRAS_MINIMAS_CORPUS}): "
+                      "las tablas de n-gramas serán dispersas y poco fiables", stacklevel=2)
+
+    tablas = []
+    for n in range(1, orden + 1):
+        cuentas: Counter = Counter()
+        codigo = 0
+        modulo = tam ** n
+        for i, letra in enumerate(letras):
+            codigo = (codigo * tam + letra) % modulo
+            if i >= n - 1:
+                cuentas[codigo] += 1
+        total = max(sum(cuentas.values()), 1)
+        tabla = array('f', [math.log10(0.01 / total)]) * modulo
+        for codigo, cuenta in cuentas.items():
+            tabla[codigo] = math.log10(cuenta / total)
+        tablas.append(tabla)
+    return tablas
+
+
+def guardar(ruta: str, alfabeto: str, tablas: List[array]) -> None:
+    """Escribe las tablas en el formato binario del almacén.
+
+    Se escribe en un temporal de nombre único en el mismo directorio y se
+    renombra al final: dos procesos que construyan el mismo modelo a la vez no
+    se pisan el fichero y un lector nunca ve un modelo a medias.
+    """
+    alfabeto_bytes = alfabeto.encode('utf-8')
+    orden_bytes = 0 if sys.byteorder == 'little' else 1
+    directorio = os.path.dirname(ruta) or '.'
+    os.makedirs(directorio, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=directorio, prefix=os.path.basename(ruta) + '.', suffix='.tmp',
+                                     delete=False) as f:
+        temporal = f.name
+        try:
+            f.write(CABECERA.pack(MAGIA, VERSION, len(tablas), orden_bytes, len(alfabeto_bytes)))
+            f.write(alfabeto_bytes)
+            f.write(b'\0' * (-f.tell() % 4))
+            for tabla in tablas:
+                tabla.tofile(f)
+        except BaseException:
+            f.close()
+            os.unlink(temporal)
+            raise
+    os.replace(temporal, ruta)
+
+
+def construir_modelo(idioma: str, corpus: str, alfabeto: str = ALFABETO_ES, orden: int = ORDEN_MAXIMO) -> str:
+    """Entrena y guarda el modelo de un idioma; devuelve la ruta del fichero."""
+    ruta = ruta_modelo(idioma)
+    guardar(ruta, alfabeto, entrenar(corpus, alfabeto, orden))
+    return ruta
+
+
+class ModeloNgramas:
+    """Modelo de n-gramas proyectado en memoria con mmap (solo lectura)."""
+
+    def __init__(self, ruta: str):
+        with open(ruta, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magia, version, orden, orden_bytes, largo = CABECERA.unpack_from(self._mmap, 0)
+        if magia != MAGIA or version != VERSION:
+            raise ValueError(f"{ruta}: no es un modelo de n-gramas (versión {VERSION})")
+        if orden_bytes != (0 if sys.byteorder == 'little' else 1):
+            raise ValueError(f"{ruta}: modelo escrito con otro orden de bytes")
+        inicio = CABECERA.size
+        self.alfabeto = bytes(self._mmap[inicio:inicio + largo]).decode('utf-8')
+        self.orden = orden
+        self.indice = {c: i for i, c in enumerate(self.alfabeto)}
+
+        vista = memoryview(self._mmap)
+        posicion = inicio + largo + (-(inicio + largo) % 4)
+        self._tablas = []
+        for n in range(1, orden + 1):
+            bytes_tabla = 4 * len(self.alfabeto) ** n
+            self._tablas.append(vista[posicion:posicion + bytes_tabla].cast('f'))
+            posicion += bytes_tabla
+
+    def tabla(self, n: int) -> memoryview:
+        """Tabla de log10-probabilidades de orden n, indexada por el código base len(alfabeto)."""
+        return self._tablas[n - 1]
+
+    def unigramas(self, alfabeto: Optional[str] = None) -> Dict[str, float]:
+        """Probabilidades de las letras (opcionalmente restringidas a alfabeto), normalizadas."""
+        letras = alfabeto if alfabeto is not None else self.alfabeto
+        tabla = self.tabla(1)
+        probabilidades = {c: 10 ** tabla[self.indice[c]] if c in self.indice else 0.0 for c in letras}
+        total = sum(probabilidades.values())
+        return {c: p / total for c, p in probabilidades.items()}
+
+
+_modelos: Dict[str, ModeloNgramas] = {}
+
+
+def cargar_modelo(idioma: str, corpus: Optional[Sequence[str]] = None) -> ModeloNgramas:
+    """Modelo de un idioma, proyectado una sola vez por proceso.
+
+    El repositorio no incluye ningún corpus: si el fichero del modelo no existe
+    y no se dan las rutas de un corpus para construirlo, se lanza
+    FileNotFoundError con las instrucciones.
+    """
+    modelo = _modelos.get(idioma)
+    if modelo is None:
+        ruta = ruta_modelo(idioma)
+        if not os.path.exists(ruta):
+            if not corpus:
+                raise FileNotFoundError(
+                    f"No hay modelo de n-gramas para '{idioma}' ({ruta}). Constrúyelo con "
+                    f"'python modelo_ngramas.py {idioma} CORPUS.txt ...' a partir de textos largos del "
+                    f"idioma (al menos {LETRAS_MINIMAS_CORPUS} letras; un párrafo no basta)")
+            construir_modelo(idioma, leer_corpus(corpus))
+        modelo = _modelos[idioma] = ModeloNgramas(ruta)
+    return modelo
+
+
+def existe_modelo(idioma: str) -> bool:
+    """Indica si el idioma tiene modelo en el almacén."""
+    return idioma in _modelos or os.path.exists(ruta_modelo(idioma))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Construye un modelo de n-gramas a partir de un corpus.")
+    parser.add_argument('idioma', help="Código del idioma (nombre del modelo)")
+    parser.add_argument('corpus', nargs='+', help="Ficheros del corpus (texto UTF-8)")
+    parser.add_argument('-a', '--alfabeto', default=ALFABETO_ES, help="Letras del modelo, en orden")
+    parser.add_argument('-n', '--orden', type=int, default=ORDEN_MAXIMO, help="Orden máximo de los n-gramas")
+    args = parser.parse_args()
+
+    ruta = construir_modelo(args.idioma, leer_corpus(args.corpus), args.alfabeto, args.orden)
+    print(f"Modelo '{args.idioma}' ({args.orden}-gramas, {len(args.alfabeto)} letras): {ruta} ({os.path.getsize(ruta)} bytes)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,23 @@
+import io
+import unittest
+
+from cesar_lots import llegir_registres
+
+
+class LlegirRegistresTest(unittest.TestCase):
+
+    def registres(self, dades, mida_bloc, mida_maxima):
+        return list(llegir_registres(io.BytesIO(dades), b'\n', mida_bloc, mida_maxima))
+
+    def test_registre_massa_gran_no_depen_del_bloc(self):
+        dades = b'curt\n' + b'x' * 50 + b'\nfinal\n'
+        esperat = [(b'curt', False), (b'x' * 10, True), (b'final', False)]
+        for mida_bloc in (7, 4096):
+            self.assertEqual(self.registres(dades, mida_bloc, 10), esperat)
+
+    def test_registre_final_sense_separador(self):
+        self.assertEqual(self.registres(b'abc\ndef', 2, 10), [(b'abc', False), (b'def', False)])
+
+
+if __name__ == '__main__':
+    unittest.main()
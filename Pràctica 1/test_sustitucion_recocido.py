@@ -0,0 +1,37 @@
+import random
+import unittest
+import warnings
+
+from ex2 import PLAINTEXT
+from ex2_Desxifrar import CIFRADO_SIMPLE, aplicar_mapeo
+from modelo_ngramas import existe_modelo
+from sustitucion_recocido import ALFABETO, entrenar_cuadrigramas, resolver_sustitucion
+
+CLARO_SIMPLE = ("el viento soplaba con fuerza sobre las montañas y el eco de los pájaros resonaba en el "
+                "valle las nubes ocultaban el sol mientras un río serpenteaba entre los árboles verdes la "
+                "gente del pueblo miraba al cielo con esperanza de que la lluvia trajera buenas cosechas")
+
+
+class ResolverSustitucionTest(unittest.TestCase):
+
+    def test_recupera_clave_conocida(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')  # corpus de prueba por debajo del mínimo
+            tabla = entrenar_cuadrigramas(PLAINTEXT)
+        claro = PLAINTEXT[:400].lower()
+        permutada = list(ALFABETO)
+        random.Random(1).shuffle(permutada)
+        clave = dict(zip(ALFABETO, permutada))
+        cifrado = ''.join(clave.get(c, c) for c in claro)
+
+        _, mapeo = resolver_sustitucion(cifrado, tabla, float('inf'), procesos=1, reinicios=5)
+        self.assertEqual(aplicar_mapeo(cifrado, mapeo), claro)
+
+    @unittest.skipUnless(existe_modelo('es'), "sin modelo 'es' (python modelo_ngramas.py es CORPUS.txt)")
+    def test_cifrado_simple_con_valores_por_defecto(self):
+        _, mapeo = resolver_sustitucion(CIFRADO_SIMPLE, procesos=1)
+        self.assertEqual(aplicar_mapeo(CIFRADO_SIMPLE, mapeo), CLARO_SIMPLE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,11 @@
+from euclides import mcd, mcd_extendido
+
+
+def imprimir_paso(dividendo, divisor, cociente, resto):
+    """Traza de los algoritmos: muestra una división de Euclides."""
+    print(f"{dividendo} = {divisor} × {cociente} + {resto}")
+
+
 def mcd_euclides(d, n):
     """
     Calcula el máximo común divisor de dos enteros d y n
@@ -20,14 +28,8 @@ def mcd_euclides(d, n):
     
     print(f"Calculando MCD({d}, {n}) usando el algoritmo de Euclides:")
     
-    # Algoritmo de Euclides
-    while n != 0:
-        resto = d % n
-        print(f"{d} = {n} × {d // n} + {resto}")
-        d = n
-        n = resto
-    
-    return d
+    # Algoritmo de Euclides (cada paso se imprime con la traza)
+    return mcd(d, n, traza=imprimir_paso)
 
 
 def mcd_euclides_extendido(d, n):
@@ -56,27 +58,10 @@ def mcd_euclides_extendido(d, n):
     else:
         intercambiado = False
     
-    # Inicializar coeficientes
-    x0, x1 = 1, 0
-    y0, y1 = 0, 1
-    
     print(f"\nCalculando MCD extendido de ({d_orig}, {n_orig}):")
     
-    d_temp, n_temp = d, n
-    while n_temp != 0:
-        cociente = d_temp // n_temp
-        resto = d_temp % n_temp
-        
-        print(f"{d_temp} = {n_temp} × {cociente} + {resto}")
-        
-        # Actualizar coeficientes
-        x0, x1 = x1, x0 - cociente * x1
-        y0, y1 = y1, y0 - cociente * y1
-        
-        d_temp = n_temp
-        n_temp = resto
-    
-    mcd = d_temp
+    # Coeficientes de Bézout de los valores ya ordenados
+    mcd, x0, y0 = mcd_extendido(d, n, traza=imprimir_paso)
     
     # Ajustar coeficientes si se intercambiaron los números
     if intercambiado:
@@ -1,27 +1,8 @@
+from euclides import inversos_por_lotes, mcd_extendido
+
+
 def euclides_extendido(d, n):
-    d_orig, n_orig = d, n
-    d = abs(d)
-    n = abs(n)
-    
-    x0, x1 = 1, 0
-    y0, y1 = 0, 1
-    
-    d_temp, n_temp = d, n
-    while n_temp != 0:
-        cociente = d_temp // n_temp
-        resto = d_temp % n_temp
-        x0, x1 = x1, x0 - cociente * x1
-        y0, y1 = y1, y0 - cociente * y1
-        d_temp = n_temp
-        n_temp = resto
-    
-    mcd = d_temp
-    x_final, y_final = x0, y0
-    if d_orig < 0:
-        x_final = -x_final
-    if n_orig < 0:
-        y_final = -y_final
-    return mcd, x_final, y_final
+    return mcd_extendido(d, n)
 
 
 def inverso_modular(d, n):
@@ -37,6 +18,14 @@ def inverso_modular(d, n):
     return inverso
 
 
+def inversos_modulares(valores, n):
+    """
+    Inversos de muchos valores módulo n con una sola llamada a inverso_modular
+    (inversión por lotes de Montgomery). None para los valores sin inverso.
+    """
+    return inversos_por_lotes(valores, n, inverso_modular)
+
+
 def main():
     d = int(input("Introduce d: "))
     n = int(input("Introduce n: "))
@@ -1,3 +1,8 @@
+from functools import lru_cache
+
+from ex1_B import inverso_modular
+
+
 def exponenciacion_binaria(m, e, n):
     """
     Calcula m^e mod n usando el método de exponenciación binaria.
@@ -34,8 +39,295 @@ def exponenciacion_binaria(m, e, n):
     return resultado
 
 
+def tamano_ventana(bits):
+    """
+    Tamaño de ventana que minimiza las multiplicaciones para un exponente de bits bits.
+    
+    Args:
+        bits (int): Longitud del exponente en bits
+    
+    Returns:
+        int: Tamaño de ventana k (se precalculan 2^(k-1) potencias impares)
+    """
+    for k, limite in ((1, 8), (2, 24), (3, 80), (4, 240), (5, 672)):
+        if bits <= limite:
+            return k
+    return 6
+
+
+def exponenciacion_ventana(m, e, n, k=None):
+    """
+    Calcula m^e mod n con ventana deslizante de izquierda a derecha.
+    
+    Precalcula las potencias impares m^1, m^3, ..., m^(2^k - 1) y recorre el
+    exponente desde el bit más significativo: cada bit cuesta un cuadrado y
+    cada ventana (que empieza y acaba en un 1) una sola multiplicación.
+    
+    Args:
+        m (int): Base
+        e (int): Exponente
+        n (int): Módulo
+        k (int): Tamaño de ventana (por defecto, según la longitud de e)
+    
+    Returns:
+        int: El resultado de m^e mod n (None si e < 0), como exponenciacion_binaria
+    """
+    if n == 1:
+        return 0
+    
+    if e == 0:
+        return 1 % n
+    
+    if e < 0:
+        return None
+    
+    bits = e.bit_length()
+    if k is None:
+        k = tamano_ventana(bits)
+    
+    reducir = n.__rmod__
+    return aplicar_ventanas(potencias_impares(m % n, k, reducir), plan_ventanas(e, k), reducir)
+
+
+class BaseFija:
+    """
+    Potencias de una base fija módulo n con tablas precalculadas.
+    
+    Con ventanas de k bits, guarda m^(d * 2^(k*i)) mod n para cada posición i y
+    cada dígito d = 1..2^k - 1. Así m^e es el producto de una entrada por
+    ventana no nula del exponente: ningún cuadrado y como mucho
+    bits/k multiplicaciones por exponenciación.
+    
+    Args:
+        m (int): Base
+        n (int): Módulo
+        bits (int): Longitud máxima prevista de los exponentes (la tabla crece si hace falta)
+        k (int): Tamaño de ventana
+    """
+    
+    def __init__(self, m, n, bits=None, k=4):
+        if n <= 0:
+            raise ValueError("El módulo debe ser un número positivo")
+        self.n = n
+        self.k = k
+        self.base = m % n
+        self.tabla = []
+        self._ampliar(bits or n.bit_length())
+    
+    def _ampliar(self, bits):
+        """Añade filas a la tabla hasta cubrir exponentes de bits bits."""
+        n, k = self.n, self.k
+        filas = -(-bits // k)
+        # Primera entrada de la fila siguiente: m^(2^(k*i))
+        if self.tabla:
+            fila = self.tabla[-1]
+            potencia = (fila[-1] * fila[0]) % n
+        else:
+            potencia = self.base
+        while len(self.tabla) < filas:
+            fila = [potencia]
+            for _ in range((1 << k) - 2):
+                fila.append((fila[-1] * potencia) % n)
+            self.tabla.append(fila)
+            potencia = (fila[-1] * potencia) % n
+    
+    def potencia(self, e):
+        """
+        Calcula base^e mod n.
+        
+        Args:
+            e (int): Exponente (no negativo)
+        
+        Returns:
+            int: base^e mod n (None si e < 0)
+        """
+        if e < 0:
+            return None
+        n, k = self.n, self.k
+        if n == 1:
+            return 0
+        if e.bit_length() > len(self.tabla) * k:
+            self._ampliar(e.bit_length())
+        mascara = (1 << k) - 1
+        resultado = 1
+        i = 0
+        while e:
+            digito = e & mascara
+            if digito:
+                resultado = (resultado * self.tabla[i][digito - 1]) % n
+            e >>= k
+            i += 1
+        return resultado % n
+
+
+@lru_cache(maxsize=64)
+def plan_ventanas(e, k):
+    """
+    Descompone el exponente en ventanas deslizantes (de izquierda a derecha).
+    
+    Args:
+        e (int): Exponente positivo
+        k (int): Tamaño de ventana
+    
+    Returns:
+        tuple: Pares (cuadrados, índice): elevar al cuadrado ese número de veces y
+        multiplicar por la potencia impar m^(2*índice+1); índice None al final
+        si el exponente acaba en ceros.
+    """
+    plan = []
+    i = e.bit_length() - 1
+    cuadrados = 0
+    while i >= 0:
+        if not (e >> i) & 1:
+            cuadrados += 1
+            i -= 1
+            continue
+        j = max(i - k + 1, 0)
+        while not (e >> j) & 1:
+            j += 1
+        plan.append((cuadrados + i - j + 1, ((e >> j) & ((1 << (i - j + 1)) - 1)) >> 1))
+        cuadrados = 0
+        i = j - 1
+    if cuadrados:
+        plan.append((cuadrados, None))
+    return tuple(plan)
+
+
+def potencias_impares(x, k, reducir):
+    """
+    Potencias impares x^1, x^3, ..., x^(2^k - 1) que usan las ventanas de k bits.
+    
+    Args:
+        x (int): Base ya reducida
+        k (int): Tamaño de ventana
+        reducir (callable): Reducción de un producto (por ejemplo, n.__rmod__)
+    
+    Returns:
+        list: impares[j] = x^(2j+1)
+    """
+    cuadrado = reducir(x * x)
+    impares = [x]
+    for _ in range((1 << (k - 1)) - 1):
+        impares.append(reducir(impares[-1] * cuadrado))
+    return impares
+
+
+def aplicar_ventanas(impares, plan, reducir):
+    """
+    Recorre un plan de plan_ventanas con las potencias impares de una base.
+    
+    Args:
+        impares (list): Resultado de potencias_impares
+        plan (tuple): Resultado de plan_ventanas (exponente positivo)
+        reducir (callable): Reducción de un producto
+    
+    Returns:
+        int: La potencia, en la misma representación que impares
+    """
+    resultado = None
+    for cuadrados, indice in plan:
+        if resultado is not None:
+            for _ in range(cuadrados):
+                resultado = reducir(resultado * resultado)
+        if indice is not None:
+            resultado = impares[indice] if resultado is None else reducir(resultado * impares[indice])
+    return resultado
 
 
+class ContextoModular:
+    """
+    Aritmética módulo n reutilizable para muchas operaciones con el mismo módulo.
+    
+    Por defecto las potencias usan pow (exponenciación en C), que en CPython
+    es lo más rápido. Con montgomery=True los valores internos están en forma
+    de Montgomery (x·R mod n, R = 2^bits) y cada producto se reduce con REDC
+    (dos multiplicaciones, una máscara y un desplazamiento, sin dividir; n
+    debe ser impar), con el plan de ventanas de plan_ventanas compartido por
+    todo el lote. Es una opción didáctica: en CPython la división de % está
+    en C y REDC en Python resulta más lento (unas 1,5 veces a 2048 bits).
+    
+    Args:
+        n (int): Módulo (positivo)
+        montgomery (bool): Usar reducción de Montgomery
+    """
+    
+    def __init__(self, n, montgomery=False):
+        if n <= 0:
+            raise ValueError("El módulo debe ser un número positivo")
+        if montgomery and n % 2 == 0:
+            raise ValueError("La reducción de Montgomery necesita un módulo impar")
+        self.n = n
+        self.montgomery = montgomery and n > 1
+        if self.montgomery:
+            self.r_bits = n.bit_length()
+            self.mascara = (1 << self.r_bits) - 1
+            # n' = -n^(-1) mod R
+            self.n_prima = (-inverso_modular(n, 1 << self.r_bits)) & self.mascara
+            self.r_mod_n = (1 << self.r_bits) % n
+            self.r2_mod_n = (self.r_mod_n * self.r_mod_n) % n
+    
+    def _redc(self, t):
+        """t·R^(-1) mod n para 0 <= t < n·R."""
+        u = ((t & self.mascara) * self.n_prima) & self.mascara
+        t = (t + u * self.n) >> self.r_bits
+        return t - self.n if t >= self.n else t
+    
+    def entrar(self, x):
+        """Pasa x a la representación interna."""
+        if self.montgomery:
+            return self._redc((x % self.n) * self.r2_mod_n)
+        return x % self.n
+    
+    def salir(self, x):
+        """Pasa un valor interno a su entero ordinario módulo n."""
+        return self._redc(x) if self.montgomery else x
+    
+    def mul(self, a, b):
+        """Producto de dos valores internos."""
+        if self.montgomery:
+            return self._redc(a * b)
+        return (a * b) % self.n
+    
+    def cuadrado(self, a):
+        """Cuadrado de un valor interno."""
+        return self.mul(a, a)
+    
+    def potencia(self, m, e, k=None):
+        """
+        Calcula m^e mod n (enteros ordinarios), como exponenciacion_ventana.
+        
+        Returns:
+            int: El resultado de m^e mod n (None si e < 0)
+        """
+        return self.potencias([m], e, k)[0]
+    
+    def potencias(self, bases, e, k=None):
+        """
+        Calcula b^e mod n para cada base con el mismo exponente.
+        
+        Sin Montgomery es una llamada a pow por base. Con Montgomery el
+        exponente se descompone una sola vez para todo el lote y cada base
+        solo calcula sus potencias impares.
+        
+        Args:
+            bases (iterable): Bases (enteros ordinarios)
+            e (int): Exponente
+            k (int): Tamaño de ventana con Montgomery (por defecto, según la longitud de e)
+        
+        Returns:
+            list: Los resultados, en el orden de las bases
+        """
+        bases = list(bases)
+        n = self.n
+        if e < 0:
+            return [None] * len(bases)
+        if not self.montgomery or e == 0:
+            return [pow(b, e, n) for b in bases]
+        if k is None:
+            k = tamano_ventana(e.bit_length())
+        plan = plan_ventanas(e, k)
+        redc = self._redc
+        return [redc(aplicar_ventanas(potencias_impares(self.entrar(b), k, redc), plan, redc)) for b in bases]
 
 def main():
     """Función principal del programa"""
@@ -0,0 +1,290 @@
+"""
+Generación de primos y de claves RSA.
+
+Los candidatos salen de un intervalo aleatorio de impares que se criba de una
+vez con la tabla de primos pequeños: solo los supervivientes (uno de cada
+diez, más o menos) pasan por Miller-Rabin, con las potencias de
+ContextoModular. La búsqueda se reparte entre los procesos de un pool y d se
+obtiene con inverso_modular.
+
+    python generar_claves.py -b 2048 -o claves
+    python generar_claves.py --bench -b 2048
+"""
+
+import argparse
+import os
+import secrets
+import time
+from multiprocessing import Pool
+
+from euclides import mcd
+from ex1_B import inverso_modular
+from ex1_C import ContextoModular
+from rsa_lots import ClavePrivada, clave_privada_pem, clave_publica_pem
+
+EXPONENTE_PUBLICO = 65537
+# Tamaño mínimo del módulo (primos de 64 bits, por encima de la tabla de la criba)
+BITS_MINIMOS = 128
+LIMITE_CRIBA = 1 << 16
+# Impares consecutivos que se criban de una vez
+TAMANO_VENTANA = 4096
+
+
+def criba_eratostenes(limite):
+    """
+    Primos menores que limite.
+
+    Args:
+        limite (int): Cota superior (exclusiva)
+
+    Returns:
+        list: Los primos < limite, en orden
+    """
+    es_primo = bytearray([1]) * limite
+    es_primo[:2] = b'\x00\x00'
+    for p in range(2, int(limite ** 0.5) + 1):
+        if es_primo[p]:
+            es_primo[p * p::p] = bytes(len(range(p * p, limite, p)))
+    return [p for p in range(limite) if es_primo[p]]
+
+
+# Tabla de primos pequeños impares, calculada una sola vez por proceso
+PRIMOS_PEQUENOS = criba_eratostenes(LIMITE_CRIBA)[1:]
+
+
+def rondas_miller_rabin(bits):
+    """Rondas de Miller-Rabin para un error menor que 2^-100 (FIPS 186-4, tabla C.3)."""
+    if bits >= 1536:
+        return 4
+    if bits >= 1024:
+        return 5
+    if bits >= 512:
+        return 8
+    return 40
+
+
+def miller_rabin(n, rondas=None):
+    """
+    Test de primalidad de Miller-Rabin con bases aleatorias.
+
+    Args:
+        n (int): Entero a comprobar
+        rondas (int): Rondas (por defecto, según el tamaño de n)
+
+    Returns:
+        bool: False si n es compuesto; True si es primo con probabilidad
+        abrumadora
+    """
+    if n < 2:
+        return False
+    for p in PRIMOS_PEQUENOS[:50]:
+        if n % p == 0:
+            return n == p
+    if n < 4:
+        return True
+    rondas = rondas or rondas_miller_rabin(n.bit_length())
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    contexto = ContextoModular(n)
+    for ronda in range(rondas):
+        # La primera ronda usa la base 2: descarta casi todos los compuestos
+        a = 2 if ronda == 0 else 2 + secrets.randbelow(n - 3)
+        x = contexto.potencia(a, d)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = (x * x) % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def cribar_ventana(inicio, tamano=TAMANO_VENTANA):
+    """
+    Criba los impares inicio, inicio + 2, ..., inicio + 2(tamano - 1).
+
+    Para cada primo pequeño p se calcula una sola vez inicio mod p y se tachan
+    sus múltiplos de la ventana con una asignación por tramos.
+
+    Args:
+        inicio (int): Primer candidato (impar)
+        tamano (int): Número de candidatos
+
+    Returns:
+        list: Desplazamientos i tales que inicio + 2i no tiene factores pequeños
+    """
+    ventana = bytearray([1]) * tamano
+    for p in PRIMOS_PEQUENOS:
+        # Primer i con inicio + 2i ≡ 0 (mod p): i ≡ -inicio * 2^(-1) (mod p)
+        i = (-inicio * ((p + 1) // 2)) % p
+        if inicio + 2 * i == p:
+            i += p
+        if i < tamano:
+            ventana[i::p] = bytes(len(range(i, tamano, p)))
+    return [i for i in range(tamano) if ventana[i]]
+
+
+def candidato_inicial(bits):
+    """Impar aleatorio de bits bits con los dos bits altos a 1 (p·q tiene 2·bits bits)."""
+    return secrets.randbits(bits) | (3 << (bits - 2)) | 1
+
+
+def buscar_primo(bits, e=EXPONENTE_PUBLICO):
+    """
+    Busca un primo de bits bits con mcd(p - 1, e) = 1.
+
+    Returns:
+        tuple: (primo, candidatos cribados, tests de Miller-Rabin)
+    """
+    candidatos = pruebas = 0
+    while True:
+        inicio = candidato_inicial(bits)
+        candidatos += TAMANO_VENTANA
+        for i in cribar_ventana(inicio):
+            p = inicio + 2 * i
+            if p.bit_length() != bits or mcd(p - 1, e) != 1:
+                continue
+            pruebas += 1
+            if miller_rabin(p):
+                return p, candidatos, pruebas
+
+
+def _buscar_primo(tarea):
+    bits, e = tarea
+    return buscar_primo(bits, e)
+
+
+def buscar_primos(bits, cantidad=2, e=EXPONENTE_PUBLICO, procesos=None):
+    """
+    Busca varios primos distintos repartiendo la búsqueda entre procesos.
+
+    Cada proceso busca en sus propias ventanas aleatorias; se devuelven los
+    primeros que terminan y el resto de búsquedas se cancelan.
+
+    Returns:
+        tuple: (lista de primos, candidatos cribados, tests de Miller-Rabin)
+    """
+    procesos = procesos or os.cpu_count() or 1
+    primos, candidatos, pruebas = [], 0, 0
+    if procesos == 1:
+        while len(primos) < cantidad:
+            p, c, t = buscar_primo(bits, e)
+            candidatos, pruebas = candidatos + c, pruebas + t
+            if p not in primos:
+                primos.append(p)
+        return primos, candidatos, pruebas
+    with Pool(procesos) as pool:
+        while len(primos) < cantidad:
+            tareas = [(bits, e)] * max(procesos, cantidad - len(primos))
+            for p, c, t in pool.imap_unordered(_buscar_primo, tareas):
+                candidatos, pruebas = candidatos + c, pruebas + t
+                if p not in primos:
+                    primos.append(p)
+                if len(primos) == cantidad:
+                    break
+        pool.terminate()
+    return primos, candidatos, pruebas
+
+
+def generar_claves(bits=2048, e=EXPONENTE_PUBLICO, procesos=None):
+    """
+    Genera una clave RSA de bits bits.
+
+    d = e^(-1) mod λ(n), con λ(n) = mcm(p - 1, q - 1), y los parámetros CRT
+    (dp, dq, qinv) se obtienen con inverso_modular.
+
+    Returns:
+        ClavePrivada: (n, e, d, p, q, dp, dq, qinv)
+
+    Raises:
+        ValueError: Si bits es impar o menor que BITS_MINIMOS (p y q tienen
+            bits/2 bits cada uno y los dos bits altos a 1)
+    """
+    if bits % 2 or bits < BITS_MINIMOS:
+        raise ValueError(f"el tamaño del módulo debe ser par y >= {BITS_MINIMOS} bits")
+    while True:
+        (p, q), _, _ = buscar_primos(bits // 2, 2, e, procesos)
+        if p < q:
+            p, q = q, p
+        n = p * q
+        # p y q demasiado cercanos permiten factorizar n (Fermat)
+        if n.bit_length() != bits or (p - q).bit_length() <= bits // 2 - 100:
+            continue
+        lambda_n = (p - 1) * (q - 1) // mcd(p - 1, q - 1)
+        d = inverso_modular(e, lambda_n)
+        return ClavePrivada(n, e, d, p, q, d % (p - 1), d % (q - 1), inverso_modular(q, p))
+
+
+def guardar_claves(clave, directorio):
+    """
+    Escribe private.pem, public.pem y p-q-n-e.txt (como en Ex3) en directorio.
+
+    Returns:
+        list: Rutas escritas
+    """
+    os.makedirs(directorio, exist_ok=True)
+    ficheros = {
+        'private.pem': clave_privada_pem(clave),
+        'public.pem': clave_publica_pem(clave),
+        'p-q-n-e.txt': ''.join(f'{nombre} = {getattr(clave, nombre)}\n' for nombre in ('p', 'q', 'n', 'e')),
+    }
+    rutas = []
+    for nombre, contenido in ficheros.items():
+        ruta = os.path.join(directorio, nombre)
+        with open(ruta, 'w', encoding='ascii') as f:
+            f.write(contenido)
+        rutas.append(ruta)
+    return rutas
+
+
+def medir_candidatos(bits, segundos=10.0, e=EXPONENTE_PUBLICO):
+    """
+    Ritmo de la búsqueda de primos en un proceso.
+
+    Returns:
+        dict: Candidatos cribados, tests de Miller-Rabin y primos por segundo
+    """
+    candidatos = pruebas = primos = 0
+    inicio = time.perf_counter()
+    while time.perf_counter() - inicio < segundos or primos == 0:
+        _, c, t = buscar_primo(bits, e)
+        candidatos, pruebas, primos = candidatos + c, pruebas + t, primos + 1
+    transcurrido = time.perf_counter() - inicio
+    return {'candidatos/s': candidatos / transcurrido, 'Miller-Rabin/s': pruebas / transcurrido,
+            'primos/s': primos / transcurrido}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generación de claves RSA.")
+    parser.add_argument('-b', '--bits', type=int, default=2048, help="Bits del módulo n")
+    parser.add_argument('-e', '--exponente', type=int, default=EXPONENTE_PUBLICO, help="Exponente público")
+    parser.add_argument('-j', '--procesos', type=int, default=0, help="Procesos del pool (0 = todos los núcleos)")
+    parser.add_argument('-o', '--directorio', default='claves', help="Directorio donde escribir las claves")
+    parser.add_argument('--bench', action='store_true', help="Mide candidatos por segundo (primos de bits/2 bits)")
+    parser.add_argument('-t', '--tiempo', type=float, default=10.0, help="Segundos de medida con --bench")
+    args = parser.parse_args(argv)
+    if args.exponente < 3 or args.exponente % 2 == 0:
+        parser.error("el exponente público debe ser impar y >= 3")
+    if args.bits % 2 or args.bits < BITS_MINIMOS:
+        parser.error(f"el tamaño del módulo debe ser par y >= {BITS_MINIMOS} bits")
+
+    if args.bench:
+        print(f"Primos de {args.bits // 2} bits (claves de {args.bits}), ventana de {TAMANO_VENTANA}, "
+              f"criba hasta {LIMITE_CRIBA}")
+        for nombre, ritmo in medir_candidatos(args.bits // 2, args.tiempo, args.exponente).items():
+            print(f"  {nombre:<16} {ritmo:>12.2f}")
+        return
+
+    inicio = time.perf_counter()
+    clave = generar_claves(args.bits, args.exponente, args.procesos or None)
+    print(f"Clave RSA-{clave.n.bit_length()} generada en {time.perf_counter() - inicio:.1f} s")
+    for ruta in guardar_claves(clave, args.directorio):
+        print(f"  {ruta}")
+
+
+if __name__ == '__main__':
+    main()
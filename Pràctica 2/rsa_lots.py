@@ -0,0 +1,479 @@
+"""
+Cifrado y descifrado RSA por lotes con las claves PEM de Ex3.
+
+Lee claves PKCS#8 / PKCS#1 (PEM o DER) sin dependencias externas, cifra con
+relleno PKCS#1 v1.5 y descifra con el teorema chino del resto (CRT). Los
+lotes de mensajes se reparten entre los procesos de un pool.
+
+    python rsa_lots.py descifra Ex3/missatge.enc
+    python rsa_lots.py cifra mensaje.txt -o mensaje.enc
+    python rsa_lots.py bench
+"""
+
+import argparse
+import base64
+import os
+import sys
+import time
+from collections import namedtuple
+from multiprocessing import Pool
+
+from ex1_B import inverso_modular
+from ex1_C import ContextoModular
+
+DIRECTORIO_EX3 = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Ex3')
+CLAVE_PRIVADA = os.path.join(DIRECTORIO_EX3, 'private.pem')
+CLAVE_PUBLICA = os.path.join(DIRECTORIO_EX3, 'public.pem')
+
+# OID rsaEncryption (1.2.840.113549.1.1.1) codificado en DER
+OID_RSA = bytes.fromhex('2a864886f70d010101')
+
+ClavePublica = namedtuple('ClavePublica', 'n e')
+ClavePrivada = namedtuple('ClavePrivada', 'n e d p q dp dq qinv')
+
+
+# --- LECTURA DE CLAVES (PEM / DER) ---
+
+def leer_pem(datos):
+    """
+    Extrae el bloque DER de un texto PEM.
+
+    Args:
+        datos (bytes): Contenido del fichero PEM
+
+    Returns:
+        tuple: (etiqueta, bytes DER), p. ej. ('PRIVATE KEY', ...)
+    """
+    lineas = datos.decode('ascii').strip().splitlines()
+    if not lineas or not lineas[0].startswith('-----BEGIN '):
+        raise ValueError("No es un fichero PEM")
+    etiqueta = lineas[0][len('-----BEGIN '):].rstrip('-')
+    fin = lineas.index(f'-----END {etiqueta}-----')
+    return etiqueta, base64.b64decode(''.join(lineas[1:fin]))
+
+
+def _leer_tlv(der, pos):
+    """
+    Lee un elemento DER (tipo, longitud, valor) que empieza en pos.
+
+    Returns:
+        tuple: (tipo, contenido, posición siguiente)
+    """
+    tipo = der[pos]
+    longitud = der[pos + 1]
+    pos += 2
+    if longitud & 0x80:
+        bytes_longitud = longitud & 0x7f
+        longitud = int.from_bytes(der[pos:pos + bytes_longitud], 'big')
+        pos += bytes_longitud
+    if pos + longitud > len(der):
+        raise ValueError("DER truncado")
+    return tipo, der[pos:pos + longitud], pos + longitud
+
+
+def _elementos(der, tipo_esperado=0x30):
+    """Elementos (tipo, contenido) de una SEQUENCE DER."""
+    tipo, contenido, _ = _leer_tlv(der, 0)
+    if tipo != tipo_esperado:
+        raise ValueError(f"Se esperaba el tipo DER {tipo_esperado:#x} y hay {tipo:#x}")
+    elementos = []
+    pos = 0
+    while pos < len(contenido):
+        tipo, valor, pos = _leer_tlv(contenido, pos)
+        elementos.append((tipo, valor))
+    return elementos
+
+
+def _enteros(elementos):
+    return [int.from_bytes(valor, 'big') for tipo, valor in elementos if tipo == 0x02]
+
+
+def _comprobar_algoritmo(der_algoritmo):
+    tipo, oid, _ = _leer_tlv(der_algoritmo, 0)
+    if tipo != 0x06 or oid != OID_RSA:
+        raise ValueError("La clave no es RSA")
+
+
+def clave_privada_der(der, pkcs8=True):
+    """
+    Interpreta una clave privada RSA en DER (PKCS#8 o, con pkcs8=False, PKCS#1).
+
+    Recalcula qinv = q^(-1) mod p con inverso_modular y comprueba que coincide.
+
+    Returns:
+        ClavePrivada: (n, e, d, p, q, dp, dq, qinv)
+    """
+    elementos = _elementos(der)
+    if pkcs8:
+        # PrivateKeyInfo: versión, AlgorithmIdentifier, OCTET STRING con la RSAPrivateKey
+        _comprobar_algoritmo(elementos[1][1])
+        return clave_privada_der(elementos[2][1], pkcs8=False)
+    version, n, e, d, p, q, dp, dq, qinv = _enteros(elementos)[:9]
+    if version != 0:
+        raise ValueError("Solo se admiten claves RSA de dos primos")
+    if p * q != n or inverso_modular(q, p) != qinv:
+        raise ValueError("Clave RSA inconsistente")
+    return ClavePrivada(n, e, d, p, q, dp, dq, qinv)
+
+
+def clave_publica_der(der, spki=True):
+    """
+    Interpreta una clave pública RSA en DER (SubjectPublicKeyInfo o, con spki=False, PKCS#1).
+
+    Returns:
+        ClavePublica: (n, e)
+    """
+    elementos = _elementos(der)
+    if spki:
+        _comprobar_algoritmo(elementos[0][1])
+        # BIT STRING: primer byte = bits de relleno (0)
+        return clave_publica_der(elementos[1][1][1:], spki=False)
+    n, e = _enteros(elementos)[:2]
+    return ClavePublica(n, e)
+
+
+def cargar_clave(ruta):
+    """
+    Carga una clave RSA de un fichero PEM (PRIVATE KEY, RSA PRIVATE KEY,
+    PUBLIC KEY o RSA PUBLIC KEY) o DER.
+
+    Returns:
+        ClavePrivada o ClavePublica
+    """
+    with open(ruta, 'rb') as f:
+        datos = f.read()
+    if datos.lstrip().startswith(b'-----BEGIN '):
+        etiqueta, der = leer_pem(datos)
+    else:
+        etiqueta, der = None, datos
+    if etiqueta == 'PRIVATE KEY':
+        return clave_privada_der(der)
+    if etiqueta == 'RSA PRIVATE KEY':
+        return clave_privada_der(der, pkcs8=False)
+    if etiqueta == 'PUBLIC KEY':
+        return clave_publica_der(der)
+    if etiqueta == 'RSA PUBLIC KEY':
+        return clave_publica_der(der, spki=False)
+    # DER sin etiqueta: se prueban los formatos en orden
+    for lector in (clave_privada_der, lambda d: clave_privada_der(d, False),
+                   clave_publica_der, lambda d: clave_publica_der(d, False)):
+        try:
+            return lector(der)
+        except (ValueError, IndexError):
+            continue
+    raise ValueError(f"{ruta}: formato de clave no reconocido")
+
+
+def publica(clave):
+    """Parte pública de una clave."""
+    return ClavePublica(clave.n, clave.e)
+
+
+def tamano_bytes(clave):
+    return (clave.n.bit_length() + 7) // 8
+
+
+# --- ESCRITURA DE CLAVES ---
+
+def _der(tipo, contenido):
+    """Codifica un elemento DER (tipo, longitud, contenido)."""
+    if len(contenido) < 0x80:
+        longitud = bytes([len(contenido)])
+    else:
+        bytes_longitud = len(contenido).to_bytes((len(contenido).bit_length() + 7) // 8, 'big')
+        longitud = bytes([0x80 | len(bytes_longitud)]) + bytes_longitud
+    return bytes([tipo]) + longitud + contenido
+
+
+def _der_entero(x):
+    return _der(0x02, x.to_bytes(x.bit_length() // 8 + 1, 'big'))
+
+
+def escribir_pem(etiqueta, der):
+    """Texto PEM (líneas de 64 caracteres) de un bloque DER."""
+    texto = base64.b64encode(der).decode('ascii')
+    lineas = [texto[i:i + 64] for i in range(0, len(texto), 64)]
+    return '\n'.join([f'-----BEGIN {etiqueta}-----', *lineas, f'-----END {etiqueta}-----', ''])
+
+
+def clave_privada_pem(clave):
+    """Clave privada en PEM PKCS#8 (como Ex3/private.pem)."""
+    rsa = _der(0x30, b''.join(_der_entero(x) for x in (0, *clave)))
+    algoritmo = _der(0x30, _der(0x06, OID_RSA) + _der(0x05, b''))
+    return escribir_pem('PRIVATE KEY', _der(0x30, _der_entero(0) + algoritmo + _der(0x04, rsa)))
+
+
+def clave_publica_pem(clave):
+    """Clave pública en PEM SubjectPublicKeyInfo (como Ex3/public.pem)."""
+    rsa = _der(0x30, _der_entero(clave.n) + _der_entero(clave.e))
+    algoritmo = _der(0x30, _der(0x06, OID_RSA) + _der(0x05, b''))
+    return escribir_pem('PUBLIC KEY', _der(0x30, algoritmo + _der(0x03, b'\x00' + rsa)))
+
+
+# --- RELLENO PKCS#1 v1.5 ---
+
+def rellenar_pkcs1(mensaje, k):
+    """
+    Rellena un mensaje para cifrarlo (EME-PKCS1-v1_5: 00 02 PS 00 M).
+
+    Args:
+        mensaje (bytes): Mensaje de como mucho k - 11 bytes
+        k (int): Tamaño del módulo en bytes
+
+    Returns:
+        int: Bloque rellenado como entero
+    """
+    if len(mensaje) > k - 11:
+        raise ValueError(f"Mensaje demasiado largo: máximo {k - 11} bytes")
+    relleno = bytearray()
+    while len(relleno) < k - 3 - len(mensaje):
+        relleno.extend(b for b in os.urandom(k - 3 - len(mensaje) - len(relleno)) if b)
+    return int.from_bytes(b'\x00\x02' + bytes(relleno) + b'\x00' + mensaje, 'big')
+
+
+def quitar_relleno_pkcs1(bloque, k):
+    """
+    Extrae el mensaje de un bloque descifrado.
+
+    Args:
+        bloque (int): Bloque descifrado
+        k (int): Tamaño del módulo en bytes
+
+    Returns:
+        bytes: El mensaje original
+    """
+    datos = bloque.to_bytes(k, 'big')
+    separador = datos.find(b'\x00', 2)
+    if datos[:2] != b'\x00\x02' or separador < 10:
+        raise ValueError("Relleno PKCS#1 v1.5 incorrecto")
+    return datos[separador + 1:]
+
+
+# --- OPERACIONES RSA ---
+
+def cifrar_enteros(clave, bloques):
+    """m^e mod n para cada bloque (lote con el mismo exponente)."""
+    return ContextoModular(clave.n).potencias(bloques, clave.e)
+
+
+def descifrar_enteros(clave, bloques):
+    """
+    c^d mod n para cada bloque con el teorema chino del resto.
+
+    Se eleva módulo p y módulo q con los exponentes reducidos dp y dq (la
+    mitad de bits, con contextos de módulo reutilizados para todo el lote) y
+    se recombina con qinv = q^(-1) mod p (fórmula de Garner).
+    """
+    p, q = clave.p, clave.q
+    m1 = ContextoModular(p).potencias([c % p for c in bloques], clave.dp)
+    m2 = ContextoModular(q).potencias([c % q for c in bloques], clave.dq)
+    return [b + q * ((clave.qinv * (a - b)) % p) for a, b in zip(m1, m2)]
+
+
+def descifrar_enteros_sin_crt(clave, bloques):
+    """c^d mod n para cada bloque, sin CRT (referencia).
+
+    Usa la misma exponenciación (pow) que descifrar_enteros, de modo que la
+    diferencia entre ambos modos es solo la del CRT.
+    """
+    return ContextoModular(clave.n).potencias(bloques, clave.d)
+
+
+def cifrar(clave, mensaje):
+    """
+    Cifra un mensaje de como mucho k - 11 bytes.
+
+    Returns:
+        bytes: Texto cifrado de k bytes
+    """
+    k = tamano_bytes(clave)
+    return cifrar_enteros(clave, [rellenar_pkcs1(mensaje, k)])[0].to_bytes(k, 'big')
+
+
+def descifrar(clave, cifrado, crt=True):
+    """
+    Descifra un bloque de k bytes.
+
+    Returns:
+        bytes: El mensaje original
+    """
+    return descifrar_lote(clave, [cifrado], procesos=1, crt=crt)[0]
+
+
+# --- LOTES EN PARALELO ---
+
+# Clave de cada proceso del pool: se recibe una sola vez en el inicializador
+_clave = None
+
+
+def _iniciar_trabajador(clave):
+    global _clave
+    _clave = clave
+
+
+def _descifrar_trozo(tarea):
+    cifrados, crt = tarea
+    return _descifrar_bloques(_clave, cifrados, crt)
+
+
+def _cifrar_trozo(mensajes):
+    return _cifrar_bloques(_clave, mensajes)
+
+
+def _descifrar_bloques(clave, cifrados, crt):
+    k = tamano_bytes(clave)
+    enteros = []
+    for cifrado in cifrados:
+        if len(cifrado) != k:
+            raise ValueError(f"Bloque cifrado de {len(cifrado)} bytes; se esperaban {k}")
+        c = int.from_bytes(cifrado, 'big')
+        if c >= clave.n:
+            raise ValueError("Bloque cifrado fuera de rango")
+        enteros.append(c)
+    bloques = descifrar_enteros(clave, enteros) if crt else descifrar_enteros_sin_crt(clave, enteros)
+    return [quitar_relleno_pkcs1(m, k) for m in bloques]
+
+
+def _cifrar_bloques(clave, mensajes):
+    k = tamano_bytes(clave)
+    bloques = cifrar_enteros(clave, [rellenar_pkcs1(m, k) for m in mensajes])
+    return [c.to_bytes(k, 'big') for c in bloques]
+
+
+def _repartir(elementos, procesos):
+    """Trozos consecutivos (unos cuatro por proceso) para el pool."""
+    tamano = max(1, -(-len(elementos) // (4 * procesos)))
+    return [elementos[i:i + tamano] for i in range(0, len(elementos), tamano)]
+
+
+def descifrar_lote(clave, cifrados, procesos=None, crt=True):
+    """
+    Descifra muchos bloques, repartidos entre los procesos de un pool.
+
+    Args:
+        clave (ClavePrivada): Clave privada
+        cifrados (list): Bloques cifrados de k bytes
+        procesos (int): Procesos del pool (1 = sin pool; None = todos los núcleos)
+        crt (bool): Usar el teorema chino del resto
+
+    Returns:
+        list: Mensajes descifrados, en el mismo orden
+    """
+    cifrados = list(cifrados)
+    procesos = procesos or os.cpu_count() or 1
+    if procesos == 1 or len(cifrados) <= 1:
+        return _descifrar_bloques(clave, cifrados, crt)
+    with Pool(procesos, initializer=_iniciar_trabajador, initargs=(clave,)) as pool:
+        trozos = pool.map(_descifrar_trozo, [(t, crt) for t in _repartir(cifrados, procesos)])
+    return [m for trozo in trozos for m in trozo]
+
+
+def cifrar_lote(clave, mensajes, procesos=None):
+    """
+    Cifra muchos mensajes (de como mucho k - 11 bytes cada uno) con un pool.
+
+    Returns:
+        list: Bloques cifrados de k bytes, en el mismo orden
+    """
+    mensajes = list(mensajes)
+    procesos = procesos or os.cpu_count() or 1
+    clave = publica(clave)
+    if procesos == 1 or len(mensajes) <= 1:
+        return _cifrar_bloques(clave, mensajes)
+    with Pool(procesos, initializer=_iniciar_trabajador, initargs=(clave,)) as pool:
+        trozos = pool.map(_cifrar_trozo, _repartir(mensajes, procesos))
+    return [c for trozo in trozos for c in trozo]
+
+
+def cifrar_bytes(clave, datos, procesos=None):
+    """Cifra datos de cualquier longitud en bloques de k - 11 bytes."""
+    maximo = tamano_bytes(clave) - 11
+    trozos = [datos[i:i + maximo] for i in range(0, len(datos), maximo)] or [b'']
+    return b''.join(cifrar_lote(clave, trozos, procesos))
+
+
+def descifrar_bytes(clave, cifrado, procesos=None, crt=True):
+    """Descifra una concatenación de bloques de k bytes (como missatge.enc)."""
+    k = tamano_bytes(clave)
+    if len(cifrado) % k:
+        raise ValueError(f"El texto cifrado no es múltiplo de {k} bytes")
+    bloques = [cifrado[i:i + k] for i in range(0, len(cifrado), k)]
+    return b''.join(descifrar_lote(clave, bloques, procesos, crt))
+
+
+# --- RENDIMIENTO ---
+
+def medir_operaciones(clave, mensajes=64, procesos=1):
+    """
+    Operaciones por segundo del descifrado con y sin CRT y del cifrado.
+
+    Los tres modos exponencian con pow, así que la razón entre los dos
+    descifrados mide el efecto del CRT y no el de la implementación.
+
+    Args:
+        clave (ClavePrivada): Clave privada
+        mensajes (int): Tamaño del lote
+        procesos (int): Procesos del pool
+
+    Returns:
+        dict: Operaciones por segundo de cada modo
+    """
+    lote = [os.urandom(32) for _ in range(mensajes)]
+    cifrados = cifrar_lote(clave, lote, procesos)
+    resultados = {}
+    inicio = time.perf_counter()
+    cifrar_lote(clave, lote, procesos)
+    resultados['cifrado'] = mensajes / (time.perf_counter() - inicio)
+    for nombre, crt in (('descifrado CRT', True), ('descifrado sin CRT', False)):
+        inicio = time.perf_counter()
+        descifrados = descifrar_lote(clave, cifrados, procesos, crt)
+        resultados[nombre] = mensajes / (time.perf_counter() - inicio)
+        if descifrados != lote:
+            raise AssertionError(f"{nombre}: el descifrado no coincide")
+    return resultados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="RSA por lotes con las claves de Ex3.")
+    sub = parser.add_subparsers(dest='orden', required=True)
+    p_descifra = sub.add_parser('descifra', help="Descifra un fichero de bloques")
+    p_descifra.add_argument('fichero', nargs='?', default=os.path.join(DIRECTORIO_EX3, 'missatge.enc'))
+    p_descifra.add_argument('-k', '--clave', default=CLAVE_PRIVADA, help="Clave privada")
+    p_descifra.add_argument('--sin-crt', action='store_true', help="Descifrar sin el teorema chino del resto")
+    p_cifra = sub.add_parser('cifra', help="Cifra un fichero")
+    p_cifra.add_argument('fichero')
+    p_cifra.add_argument('-k', '--clave', default=CLAVE_PUBLICA, help="Clave pública (o privada)")
+    p_bench = sub.add_parser('bench', help="Operaciones por segundo con y sin CRT")
+    p_bench.add_argument('-k', '--clave', default=CLAVE_PRIVADA, help="Clave privada")
+    p_bench.add_argument('-n', '--mensajes', type=int, default=64, help="Mensajes por lote")
+    for p in (p_descifra, p_cifra, p_bench):
+        p.add_argument('-j', '--procesos', type=int, default=1, help="Procesos del pool (0 = todos los núcleos)")
+    for p in (p_descifra, p_cifra):
+        p.add_argument('-o', '--salida', help="Fichero de salida (por defecto, la salida estándar)")
+    args = parser.parse_args(argv)
+
+    clave = cargar_clave(args.clave)
+    procesos = args.procesos or None
+    if args.orden == 'bench':
+        print(f"RSA-{clave.n.bit_length()}, lote de {args.mensajes} mensajes, {procesos or os.cpu_count()} procesos")
+        for nombre, ops in medir_operaciones(clave, args.mensajes, procesos).items():
+            print(f"  {nombre:<20} {ops:>10.1f} op/s")
+        return
+
+    with open(args.fichero, 'rb') as f:
+        datos = f.read()
+    if args.orden == 'descifra':
+        if not isinstance(clave, ClavePrivada):
+            parser.error("para descifrar hace falta la clave privada")
+        resultado = descifrar_bytes(clave, datos, procesos, crt=not args.sin_crt)
+    else:
+        resultado = cifrar_bytes(clave, datos, procesos)
+    if args.salida:
+        with open(args.salida, 'wb') as f:
+            f.write(resultado)
+    else:
+        sys.stdout.buffer.write(resultado)
+
+
+if __name__ == '__main__':
+    main()
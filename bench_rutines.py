@@ -0,0 +1,415 @@
+"""
+Benchmark de les rutines de criptoanàlisi i d'aritmètica modular
+Criptografia - Pràctiques 1 i 2
+
+Mesura cada rutina amb entrades sintètiques de mida creixent i desa els
+resultats en JSON. Amb --compara es contrasten amb un fitxer anterior i el
+programa acaba amb error si alguna rutina és més lenta que la tolerància.
+
+    python bench_rutines.py -o base.json
+    python bench_rutines.py --compara base.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+
+ARREL = os.path.dirname(os.path.abspath(__file__))
+for directori in ('Pràctica 1', os.path.join('Pràctica 1', 'Ex3'), 'Pràctica 2'):
+    sys.path.insert(0, os.path.join(ARREL, directori))
+
+MIDES_TEXT = [1_000, 10_000, 100_000]
+MIDES_TEXT_GRAN = MIDES_TEXT + [1_000_000]
+MIDES_BITS = [256, 1024, 2048]
+MIDES_BITS_GRAN = MIDES_BITS + [4096]
+# Al voltant del llindar de Lehmer (euclides.UMBRAL_LEHMER)
+MIDES_LEHMER = [1024, 2048, 2560, 3072, 4096]
+MIDES_LEHMER_GRAN = MIDES_LEHMER + [8192]
+MIDES_TOKENS = [100, 1_000, 10_000]
+MIDES_LOT = [100, 1_000, 10_000]
+# Lletres de cada text dels lots de textos curts
+LLARGADA_LOT = 200
+
+# Freqüències aproximades del castellà per generar text sintètic
+PESOS_LLETRES = {
+    'a': 12.5, 'b': 1.4, 'c': 4.7, 'd': 5.9, 'e': 13.7, 'f': 0.7, 'g': 1.0, 'h': 0.7,
+    'i': 6.3, 'j': 0.4, 'k': 0.1, 'l': 5.0, 'm': 3.2, 'n': 6.7, 'o': 8.7, 'p': 2.5,
+    'q': 0.9, 'r': 6.9, 's': 8.0, 't': 4.6, 'u': 3.9, 'v': 0.9, 'w': 0.1, 'x': 0.2,
+    'y': 0.9, 'z': 0.5,
+}
+
+CASOS = []
+
+
+def cas(nom, mides, unitat, mides_grans=None):
+    """
+    Registra una rutina del benchmark (mides_grans s'usa amb --gran).
+
+    La funció decorada rep la mida i retorna una funció sense arguments que
+    executa una crida a la rutina amb l'entrada ja preparada.
+    """
+    def registrar(preparar):
+        CASOS.append((nom, mides, unitat, mides_grans or mides, preparar))
+        return preparar
+    return registrar
+
+
+def text_sintetic(mida, llavor=0):
+    """Text de mida caràcters: paraules de lletres amb pesos del castellà, majúscules i puntuació."""
+    rand = random.Random(llavor)
+    lletres = list(PESOS_LLETRES)
+    pesos = list(PESOS_LLETRES.values())
+    parts = []
+    llargada = 0
+    while llargada < mida:
+        paraula = ''.join(rand.choices(lletres, pesos, k=rand.randint(1, 9)))
+        if rand.random() < 0.1:
+            paraula = paraula.capitalize()
+        separador = rand.choice(' ' * 12 + ',.\n')
+        parts.append(paraula + (separador if separador == ' ' else separador + ' '))
+        llargada += len(parts[-1])
+    return ''.join(parts)[:mida]
+
+
+def lletres_netes(mida, llavor=0):
+    """Només les lletres minúscules d'un text sintètic (entrada de l'Ex3), mida lletres."""
+    text = ''
+    while len(text) < mida:
+        text += ''.join(c for c in text_sintetic(2 * mida, llavor + len(text)).lower() if c.isalpha())
+    return text[:mida]
+
+
+def xifrar_vigenere(text, clau):
+    desplaçaments = [ord(c) - ord('a') for c in clau]
+    return ''.join(chr((ord(c) - ord('a') + desplaçaments[i % len(clau)]) % 26 + ord('a'))
+                   for i, c in enumerate(text))
+
+
+def enter_aleatori(bits, llavor):
+    rand = random.Random(llavor)
+    return rand.getrandbits(bits) | (1 << (bits - 1)) | 1
+
+
+# --- PRÀCTICA 1 ---
+
+@cas('ex1.desxifrat_cesar', MIDES_TEXT, 'caràcters', MIDES_TEXT_GRAN)
+def _desxifrat_cesar(mida):
+    from ex1 import desxifrat_cesar
+    text = text_sintetic(mida).upper()
+    return lambda: desxifrat_cesar(text, 3)
+
+
+@cas('ex1.calcular_chi_quadrat', MIDES_TEXT, 'caràcters', MIDES_TEXT_GRAN)
+def _calcular_chi_quadrat(mida):
+    from ex1 import calcular_chi_quadrat, comptar_lletres
+    text = text_sintetic(mida)
+    return lambda: calcular_chi_quadrat(comptar_lletres(text), mida)
+
+
+@cas('ex2.encrypt_simple', MIDES_TEXT, 'caràcters', MIDES_TEXT_GRAN)
+def _encrypt_simple(mida):
+    from ex2 import encrypt_simple, get_letters, simple_substitution_map
+    text = text_sintetic(mida)
+    mapa = simple_substitution_map(get_letters(text))
+    return lambda: encrypt_simple(text, mapa)
+
+
+@cas('ex2.encrypt_homophonic', MIDES_TEXT, 'caràcters', MIDES_TEXT_GRAN)
+def _encrypt_homophonic(mida):
+    from ex2 import allocate_homophones, encrypt_homophonic, get_letters
+    text = text_sintetic(mida)
+    homofons = allocate_homophones(get_letters(text), Counter(c.lower() for c in text if c.isalpha()), 200)
+    return lambda: encrypt_homophonic(text, homofons)
+
+
+@cas('ex2.allocate_homophones', MIDES_TOKENS, 'tokens')
+def _allocate_homophones(mida):
+    from ex2 import allocate_homophones, get_letters, make_token_pool
+    text = text_sintetic(10_000)
+    lletres = get_letters(text)
+    freqs = Counter(c.lower() for c in text if c.isalpha())
+    pool = make_token_pool(mida)
+    return lambda: allocate_homophones(lletres, freqs, mida, pool=pool)
+
+
+@cas('ex2_Desxifrar.aplicar_mapeo', MIDES_TEXT, 'caràcters', MIDES_TEXT_GRAN)
+def _aplicar_mapeo(mida):
+    from ex2_Desxifrar import aplicar_mapeo
+    text = text_sintetic(mida)
+    lletres = sorted(PESOS_LLETRES)
+    desordenades = lletres[:]
+    random.Random(1).shuffle(desordenades)
+    mapa = dict(zip(lletres, desordenades))
+    return lambda: aplicar_mapeo(text, mapa)
+
+
+@cas('ex2_Desxifrar.analizar_bigramas_trigramas', MIDES_TEXT, 'caràcters', MIDES_TEXT_GRAN)
+def _analizar_bigramas_trigramas(mida):
+    from ex2_Desxifrar import analizar_bigramas_trigramas
+    text = text_sintetic(mida)
+    return lambda: analizar_bigramas_trigramas(text)
+
+
+@cas('ex3.kasiski_guess_keylen', MIDES_TEXT, 'lletres', MIDES_TEXT_GRAN)
+def _kasiski_guess_keylen(mida):
+    from ex3 import kasiski_guess_keylen
+    xifrat = xifrar_vigenere(lletres_netes(mida), 'patito')
+    return lambda: kasiski_guess_keylen(xifrat, 20)
+
+
+@cas('ex3.guess_key_spanish', MIDES_TEXT, 'lletres', MIDES_TEXT_GRAN)
+def _guess_key_spanish(mida):
+    from ex3 import guess_key_spanish
+    xifrat = xifrar_vigenere(lletres_netes(mida), 'patito')
+    return lambda: guess_key_spanish(xifrat, 6)
+
+
+def textos_lot(mida, xifrar):
+    """mida textos xifrats de LLARGADA_LOT lletres, cadascun amb la seva clau."""
+    rand = random.Random(mida)
+    lletres = lletres_netes(LLARGADA_LOT * 50)
+    textos = []
+    for _ in range(mida):
+        inici = rand.randrange(len(lletres) - LLARGADA_LOT)
+        clau = ''.join(rand.choices('abcdefghijklmnopqrstuvwxyz', k=rand.randint(1, 8)))
+        textos.append(xifrar(lletres[inici:inici + LLARGADA_LOT], clau))
+    return textos
+
+
+@cas('ex1.trencar_cesar_lot', MIDES_LOT, 'textos')
+def _trencar_cesar_lot(mida):
+    from ex1 import trencar_cesar_lot
+    textos = textos_lot(mida, lambda text, clau: xifrar_vigenere(text, clau[0]))
+    return lambda: trencar_cesar_lot(textos)
+
+
+@cas('ex3.crack_vigenere_batch', MIDES_LOT, 'textos')
+def _crack_vigenere_batch(mida):
+    from ex3 import crack_vigenere_batch
+    textos = textos_lot(mida, xifrar_vigenere)
+    return lambda: crack_vigenere_batch(textos)
+
+
+# --- PRÀCTICA 2 ---
+
+@cas('ex1_B.euclides_extendido', MIDES_BITS, 'bits', MIDES_BITS_GRAN)
+def _euclides_extendido(mida):
+    from ex1_B import euclides_extendido
+    a, b = enter_aleatori(mida, 1), enter_aleatori(mida, 2)
+    return lambda: euclides_extendido(a, b)
+
+
+@cas('euclides.mcd_extendido_clasico', MIDES_LEHMER, 'bits', MIDES_LEHMER_GRAN)
+def _mcd_extendido_clasico(mida):
+    from euclides import mcd_extendido_clasico
+    a, b = enter_aleatori(mida, 1), enter_aleatori(mida, 2)
+    return lambda: mcd_extendido_clasico(a, b)
+
+
+@cas('euclides.mcd_extendido_lehmer', MIDES_LEHMER, 'bits', MIDES_LEHMER_GRAN)
+def _mcd_extendido_lehmer(mida):
+    from euclides import mcd_extendido_lehmer
+    a, b = enter_aleatori(mida, 1), enter_aleatori(mida, 2)
+    return lambda: mcd_extendido_lehmer(a, b)
+
+
+LOT_INVERSOS = 100
+
+
+@cas(f'ex1_B.inversos_modulares[{LOT_INVERSOS}]', MIDES_BITS, 'bits', MIDES_BITS_GRAN)
+def _inversos_modulares(mida):
+    from ex1_B import inversos_modulares
+    n = enter_aleatori(mida, 3)
+    valors = [enter_aleatori(mida, 10 + i) for i in range(LOT_INVERSOS)]
+    return lambda: inversos_modulares(valors, n)
+
+
+@cas('ex1_C.exponenciacion_binaria', MIDES_BITS, 'bits', MIDES_BITS_GRAN)
+def _exponenciacion_binaria(mida):
+    from ex1_C import exponenciacion_binaria
+    m, e, n = enter_aleatori(mida, 1), enter_aleatori(mida, 2), enter_aleatori(mida, 3)
+    return lambda: exponenciacion_binaria(m, e, n)
+
+
+@cas('ex1_C.exponenciacion_ventana', MIDES_BITS, 'bits', MIDES_BITS_GRAN)
+def _exponenciacion_ventana(mida):
+    from ex1_C import exponenciacion_ventana
+    m, e, n = enter_aleatori(mida, 1), enter_aleatori(mida, 2), enter_aleatori(mida, 3)
+    return lambda: exponenciacion_ventana(m, e, n)
+
+
+@cas('ex1_C.BaseFija.potencia', MIDES_BITS, 'bits', MIDES_BITS_GRAN)
+def _base_fija(mida):
+    from ex1_C import BaseFija
+    m, e, n = enter_aleatori(mida, 1), enter_aleatori(mida, 2), enter_aleatori(mida, 3)
+    base = BaseFija(m, n, mida)
+    return lambda: base.potencia(e)
+
+
+LOT_BASES = 8
+
+
+def _cas_contexte(montgomery):
+    def preparar(mida):
+        from ex1_C import ContextoModular
+        n = enter_aleatori(mida, 3)
+        e = enter_aleatori(mida, 2)
+        bases = [enter_aleatori(mida, 10 + i) for i in range(LOT_BASES)]
+        contexte = ContextoModular(n, montgomery)
+        return lambda: contexte.potencias(bases, e)
+    return preparar
+
+
+cas(f'ex1_C.ContextoModular.potencias[{LOT_BASES}]', MIDES_BITS, 'bits', MIDES_BITS_GRAN)(_cas_contexte(False))
+cas(f'ex1_C.ContextoModular.potencias[{LOT_BASES}, montgomery]', MIDES_BITS, 'bits', MIDES_BITS_GRAN)(_cas_contexte(True))
+
+
+@cas('generar_claves.cribar_ventana', MIDES_BITS, 'bits', MIDES_BITS_GRAN)
+def _cribar_ventana(mida):
+    from generar_claves import cribar_ventana
+    inici = enter_aleatori(mida, 4)
+    return lambda: cribar_ventana(inici)
+
+
+@cas('generar_claves.miller_rabin[primer]', MIDES_BITS, 'bits', MIDES_BITS_GRAN)
+def _miller_rabin(mida):
+    from generar_claves import buscar_primo, miller_rabin
+    primer = buscar_primo(mida)[0]
+    return lambda: miller_rabin(primer)
+
+
+@cas('builtins.pow', MIDES_BITS, 'bits', MIDES_BITS_GRAN)
+def _pow(mida):
+    m, e, n = enter_aleatori(mida, 1), enter_aleatori(mida, 2), enter_aleatori(mida, 3)
+    return lambda: pow(m, e, n)
+
+
+def mesurar(funcio, temps_minim=0.2, repeticions=5):
+    """
+    Cronometra una funció sense arguments.
+
+    Calibra el nombre de crides perquè cada repetició duri almenys
+    temps_minim / repeticions i fa repeticions rondes.
+
+    Returns:
+        tuple: (millor temps per crida, mediana per crida, crides per ronda)
+    """
+    crides = 1
+    while True:
+        inici = time.perf_counter()
+        for _ in range(crides):
+            funcio()
+        durada = time.perf_counter() - inici
+        if durada >= temps_minim / repeticions or crides >= 1 << 20:
+            break
+        crides *= 2 if durada == 0 else max(2, min(10, int(temps_minim / repeticions / durada) + 1))
+    temps = [durada / crides]
+    for _ in range(repeticions - 1):
+        inici = time.perf_counter()
+        for _ in range(crides):
+            funcio()
+        temps.append((time.perf_counter() - inici) / crides)
+    return min(temps), statistics.median(temps), crides
+
+
+def commit_actual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ARREL,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def executar(filtres=(), gran=False, temps_minim=0.2):
+    """
+    Executa les rutines seleccionades i retorna la llista de resultats.
+
+    Args:
+        filtres (list): Subcadenes del nom de la rutina (buit = totes)
+        gran (bool): Afegeix les mides grans (1 MB de text, claus de 4096 bits)
+        temps_minim (float): Segons mínims de mesura per rutina i mida
+    """
+    resultats = []
+    for nom, mides, unitat, mides_grans, preparar in CASOS:
+        if filtres and not any(f in nom for f in filtres):
+            continue
+        for mida in mides_grans if gran else mides:
+            millor, mediana, crides = mesurar(preparar(mida), temps_minim)
+            resultats.append({'rutina': nom, 'mida': mida, 'unitat': unitat,
+                              'millor_s': millor, 'mediana_s': mediana, 'crides': crides})
+            print(f"{nom:<45} {mida:>9} {unitat:<10} {millor * 1e3:>12.4f} ms", flush=True)
+    return resultats
+
+
+def comparar(resultats, anteriors, tolerancia):
+    """
+    Compara amb un informe anterior (mateixa rutina i mida).
+
+    Returns:
+        list: Regressions (rutina, mida, ràtio) que superen la tolerància
+    """
+    previ = {(r['rutina'], r['mida']): r['millor_s'] for r in anteriors}
+    regressions = []
+    print(f"\n{'rutina':<45} {'mida':>9} {'abans':>12} {'ara':>12} {'ràtio':>7}")
+    for r in resultats:
+        abans = previ.get((r['rutina'], r['mida']))
+        if abans is None:
+            continue
+        ratio = r['millor_s'] / abans
+        marca = '  <-- regressió' if ratio > tolerancia else ''
+        print(f"{r['rutina']:<45} {r['mida']:>9} {abans * 1e3:>10.4f}ms {r['millor_s'] * 1e3:>10.4f}ms {ratio:>7.2f}{marca}")
+        if ratio > tolerancia:
+            regressions.append((r['rutina'], r['mida'], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de les rutines de les pràctiques")
+    parser.add_argument('filtres', nargs='*', help="Només les rutines que contenen alguna d'aquestes cadenes")
+    parser.add_argument('-o', '--sortida', help="Fitxer JSON on desar els resultats")
+    parser.add_argument('-c', '--compara', help="Informe JSON anterior amb què comparar")
+    parser.add_argument('-t', '--tolerancia', type=float, default=1.25,
+                        help="Ràtio ara/abans a partir de la qual es considera regressió")
+    parser.add_argument('-m', '--temps-minim', type=float, default=0.2, help="Segons de mesura per rutina i mida")
+    parser.add_argument('-g', '--gran', action='store_true', help="Inclou les mides grans")
+    parser.add_argument('-l', '--llista', action='store_true', help="Mostra les rutines registrades i surt")
+    args = parser.parse_args(argv)
+
+    if args.llista:
+        for nom, mides, unitat, _, _ in CASOS:
+            print(f"{nom:<45} {unitat}: {', '.join(map(str, mides))}")
+        return 0
+
+    resultats = executar(args.filtres, args.gran, args.temps_minim)
+    informe = {
+        'data': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': commit_actual(),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'resultats': resultats,
+    }
+    if args.sortida:
+        with open(args.sortida, 'w', encoding='utf-8') as f:
+            json.dump(informe, f, indent=2, ensure_ascii=False)
+        print(f"\nResultats desats a {args.sortida}")
+
+    if args.compara:
+        with open(args.compara, encoding='utf-8') as f:
+            anteriors = json.load(f)['resultats']
+        regressions = comparar(resultats, anteriors, args.tolerancia)
+        if regressions:
+            print(f"\n{len(regressions)} regressions per sobre de x{args.tolerancia}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())